@@ -0,0 +1,16 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Predator-prey worlds in which critters learn by Q learning, with Pentoids
+### that hear.  Importing the package doesn't import tkinter; only the GUI
+### (audition.gui, or make_world(gui=True)) does.
+###
+###   from audition import make_world
+###   world = make_world(seed=1)
+###   world.run()
+
+from .thing import Thing, Clod, Fog, Org, Plasmoid, Critter, Diskoid, Pentoid
+from .world import World, HeadlessWorld, make_world, print_stats
+from .batch import WorldBatch
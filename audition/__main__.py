@@ -0,0 +1,90 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Running worlds from the command line:
+###
+###   python -m audition --steps 1000 --seed 1 --eta 0.5
+###   python -m audition --worlds 10 --steps 500
+###   python -m audition --steps 100000 --metrics 8765
+###   python -m audition --steps 20000 --track-memory 500
+###   python -m audition --gui
+###   python -m audition --gui --local
+
+import argparse
+from .thing import Critter
+from .world import World, make_world
+from .batch import WorldBatch
+from .metrics import MetricsServer
+from .render import Renderer
+from .memory import MemoryTracker
+
+def main(args=None):
+    '''Run headless worlds (or the GUI) as asked for by the command line arguments.'''
+    parser = argparse.ArgumentParser(prog='python -m audition',
+                                     description='Run predator-prey worlds without a display.')
+    parser.add_argument('--steps', type=int, default=World.steps_per_run,
+                        help='steps to run (default %(default)s)')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the random numbers')
+    parser.add_argument('--width', type=int, default=450)
+    parser.add_argument('--height', type=int, default=450)
+    parser.add_argument('--eta', type=float, default=Critter.eta,
+                        help='learning rate (0 for no learning, the default)')
+    parser.add_argument('--worlds', type=int, default=1,
+                        help='independent worlds to run one after another in a WorldBatch')
+    parser.add_argument('--monitor', action='store_true',
+                        help='stop once learning has converged')
+    parser.add_argument('--memory', action='store_true',
+                        help='report the memory taken up by each type of thing')
+    parser.add_argument('--metrics', type=int, default=None, metavar='PORT',
+                        help='serve live statistics (of the first world) on this local port')
+    parser.add_argument('--frames', default=None, metavar='DIRECTORY',
+                        help='write pictures of the (first) world to this directory')
+    parser.add_argument('--every', type=int, default=Renderer.every,
+                        help='steps between pictures (default %(default)s)')
+    parser.add_argument('--raw', action='store_true',
+                        help='write the pictures as one raw RGB stream instead of PNG files')
+    parser.add_argument('--track-memory', type=int, default=None, metavar='STEPS',
+                        help='sample the (first) world\'s memory every STEPS steps and report growth')
+    parser.add_argument('--gui', action='store_true', help='open the Tk window instead')
+    parser.add_argument('--local', action='store_true',
+                        help='with --gui, step the world in the window rather than in an engine process')
+    options = parser.parse_args(args)
+    Critter.eta = options.eta
+    World.monitor_convergence = options.monitor
+    if options.gui:
+        if options.local:
+            world = make_world(options.width, options.height, options.seed, gui=True)
+            world.mainloop()
+        else:
+            from .gui import main as gui_main
+            gui_main(options.width, options.height, options.seed)
+        return
+    if options.worlds > 1:
+        batch = WorldBatch(options.worlds, options.width, options.height, seed=options.seed)
+        worlds = batch.worlds
+    else:
+        worlds = [make_world(options.width, options.height, options.seed)]
+    if options.metrics is not None:
+        server = MetricsServer(worlds[0], options.metrics)
+        print('Serving statistics on http://127.0.0.1:%d/metrics' % server.start())
+    if options.frames:
+        Renderer(worlds[0], options.frames, options.raw, options.every).attach()
+    if options.track_memory:
+        tracker = MemoryTracker(worlds[0], options.track_memory)
+        tracker.attach()
+    if options.worlds > 1:
+        batch.run(options.steps)
+        # World.run reports on its observers, but a batch doesn't
+        if options.track_memory:
+            tracker.report()
+    else:
+        World.steps_per_run = options.steps
+        worlds[0].run()
+    if options.memory:
+        for world in worlds:
+            world.memory_report()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### A stand-in for the parts of the Tk Canvas that the world and its things use,
+### so that a world can run without a display (for example in a worker process).
+
+class Arena:
+    '''Canvas items (ovals, arcs, lines, rectangles) kept in memory.
+
+    Items are indexed in square cells so that overlap queries only look at
+    items near the query region.  Ovals and arcs overlap a region if the ellipse
+    (including half the width of its outline) does; the mouth of an arc is
+    ignored.  Lines and rectangles are treated as their bounding boxes.'''
+
+    cell = 32
+    """Side of the square cells used to index items by position."""
+
+    outline = 0.5
+    """Half the width of an item's outline, which counts as part of its shape."""
+
+    def __init__(self):
+        """Start out without any items."""
+        # Item id -> [kind, coords, options, bounding box]
+        self.arena_items = {}
+        # Item id -> position in the display list (higher is further up)
+        self.arena_stacking = {}
+        self.arena_top = 0
+        # Cell -> set of ids of items whose bounding box reaches into it
+        self.arena_cells = {}
+        self.arena_last_id = 0
+
+    ### Creating, changing and deleting items
+
+    def create_item(self, kind, coords, options):
+        '''Add an item of a given kind and return its id.'''
+        self.arena_last_id += 1
+        item_id = self.arena_last_id
+        coords = [float(c) for c in coords]
+        self.arena_items[item_id] = [kind, coords, options, self.coords_bbox(coords)]
+        self.index_item(item_id)
+        self.tag_raise(item_id)
+        return item_id
+
+    def create_oval(self, *coords, **options):
+        return self.create_item('oval', coords, options)
+
+    def create_arc(self, *coords, **options):
+        return self.create_item('arc', coords, options)
+
+    def create_line(self, *coords, **options):
+        return self.create_item('line', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self.create_item('rectangle', coords, options)
+
+    def coords(self, item_id, *coords):
+        '''Get the coordinates of an item, or move it to new ones.'''
+        item = self.arena_items[item_id]
+        if not coords:
+            return list(item[1])
+        self.unindex_item(item_id)
+        item[1] = [float(c) for c in coords]
+        item[3] = self.coords_bbox(item[1])
+        self.index_item(item_id)
+
+    def itemconfigure(self, item_id, **options):
+        '''Change options (fill, start, state, ...) of an item.'''
+        self.arena_items[item_id][2].update(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item_id, option):
+        '''The value of an option of an item.'''
+        return self.arena_items[item_id][2].get(option, '')
+
+    def type(self, item_id):
+        '''The kind of an item.'''
+        return self.arena_items[item_id][0]
+
+    def delete(self, item_id):
+        '''Remove an item.'''
+        if item_id in self.arena_items:
+            self.unindex_item(item_id)
+            del self.arena_items[item_id]
+            del self.arena_stacking[item_id]
+
+    ### Finding items
+
+    def bbox_cells(self, x1, y1, x2, y2):
+        '''Cells covered by the box with corners x1, y1 and x2, y2.'''
+        return [(cx, cy) for cx in range(int(x1 // Arena.cell), int(x2 // Arena.cell) + 1) \
+                for cy in range(int(y1 // Arena.cell), int(y2 // Arena.cell) + 1)]
+
+    def coords_bbox(self, coords):
+        '''Bounding box of an item with the given coordinates, including its outline.'''
+        xs, ys = coords[0::2], coords[1::2]
+        return (min(xs) - Arena.outline, min(ys) - Arena.outline,
+                max(xs) + Arena.outline, max(ys) + Arena.outline)
+
+    def index_item(self, item_id):
+        '''Add the item to the cells its bounding box covers.'''
+        for cell in self.bbox_cells(*self.arena_items[item_id][3]):
+            self.arena_cells.setdefault(cell, set()).add(item_id)
+
+    def unindex_item(self, item_id):
+        '''Remove the item from the cells its bounding box covers.'''
+        for cell in self.bbox_cells(*self.arena_items[item_id][3]):
+            ids = self.arena_cells[cell]
+            ids.discard(item_id)
+            if not ids:
+                del self.arena_cells[cell]
+
+    def item_overlaps(self, item_id, x1, y1, x2, y2):
+        '''Does the shape of the item overlap with the rectangle x1, y1, x2, y2?'''
+        kind, coords, options, bbox = self.arena_items[item_id]
+        if options.get('state') == 'hidden':
+            return False
+        ix1, iy1, ix2, iy2 = bbox
+        if ix1 > x2 or ix2 < x1 or iy1 > y2 or iy2 < y1:
+            return False
+        if kind in ('oval', 'arc'):
+            # Distance from the center of the ellipse to the nearest point of the rectangle
+            cx, cy = (ix1 + ix2) / 2.0, (iy1 + iy2) / 2.0
+            rx, ry = (ix2 - ix1) / 2.0, (iy2 - iy1) / 2.0
+            if not rx or not ry:
+                return True
+            dx = max(x1 - cx, 0, cx - x2)
+            dy = max(y1 - cy, 0, cy - y2)
+            return (dx / rx) ** 2 + (dy / ry) ** 2 <= 1.0
+        return True
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        '''Ids of the visible items that overlap with the rectangle x1, y1, x2, y2.
+
+        Like the Canvas, items are returned from the bottom of the display list up.'''
+        candidates = set()
+        for cell in self.bbox_cells(x1, y1, x2, y2):
+            candidates.update(self.arena_cells.get(cell, ()))
+        return tuple(sorted([item_id for item_id in candidates \
+                             if self.item_overlaps(item_id, x1, y1, x2, y2)],
+                            key=self.arena_stacking.get))
+
+    ### The display list
+
+    def tag_raise(self, item_id, above=None):
+        '''Move an item to the top of the display list (or just above another item).'''
+        if above is None:
+            self.arena_top += 1
+            self.arena_stacking[item_id] = self.arena_top
+        else:
+            self.arena_stacking[item_id] = self.arena_stacking[above] + 0.5
+
+    def tag_lower(self, item_id, below=None):
+        '''Move an item to the bottom of the display list (or just below another item).'''
+        if below is None:
+            self.arena_stacking[item_id] = min(self.arena_stacking.values()) - 1
+        else:
+            self.arena_stacking[item_id] = self.arena_stacking[below] - 0.5
+
+    ### Canvas methods that only matter when there is a display
+
+    def tag_bind(self, item_id, sequence, func):
+        return None
+
+    def tag_unbind(self, item_id, sequence, funcid=None):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def grid(self, **options):
+        pass
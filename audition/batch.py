@@ -0,0 +1,84 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Many small, independent worlds stepped together in one process, for running
+### replicates of an experiment without a display or a process per world.  Each
+### world has its own random number state, so world k of a batch goes through
+### exactly what a HeadlessWorld made after random.seed(seeds[k]) would.
+###
+### This is a convenience, not a faster engine: the worlds are simply stepped one
+### after another, so K worlds take as long as K separate runs (or K processes
+### on one core).  What it saves is the bookkeeping of seeds and the pooling of
+### the statistics.
+###
+###   batch = WorldBatch(20, seed=1)
+###   batch.run(500)
+###   batch.world(3).run_stats()
+
+import random
+from .thing import *
+from .world import World, HeadlessWorld, print_stats
+
+class WorldBatch:
+    '''K independent worlds of the same size, stepped in lockstep, one after another.
+
+    All of the worlds share the thing classes and their parameters (Critter.eta
+    and so on); each has its own things, Q tables, sounds and random numbers.'''
+
+    def __init__(self, k, width=450, height=450, seed=None, seeds=None):
+        """Make k worlds, seeded with seeds if given or else with seeds drawn from seed."""
+        if seeds is None:
+            generator = random.Random(seed)
+            seeds = [generator.randrange(2 ** 32) for i in range(k)]
+        self.seeds = list(seeds)
+        self.worlds = []
+        # Random number state of each world between steps
+        self.states = []
+        saved = random.getstate()
+        for world_seed in self.seeds:
+            random.seed(world_seed)
+            self.worlds.append(HeadlessWorld(width, height))
+            self.states.append(random.getstate())
+        random.setstate(saved)
+
+    def __len__(self):
+        return len(self.worlds)
+
+    def world(self, k):
+        '''The k-th world, an ordinary World that can be inspected or stepped on its own.
+
+        Stepping it outside of the batch uses the global random numbers, so it
+        won't match a run of the batch any more.'''
+        return self.worlds[k]
+
+    def step(self):
+        """Step each of the worlds once, with its own random numbers."""
+        saved = random.getstate()
+        for k, world in enumerate(self.worlds):
+            random.setstate(self.states[k])
+            world.step()
+            self.states[k] = random.getstate()
+        random.setstate(saved)
+
+    def run(self, steps=None):
+        """Run step() steps (default World.steps_per_run) times and print statistics."""
+        for world in self.worlds:
+            world.stop_run = False
+        for s in range(steps or World.steps_per_run):
+            self.step()
+            # Stop early once every world's observers have asked to
+            if all([world.stop_run for world in self.worlds]):
+                break
+        self.run_stats()
+
+    def org_stats(self):
+        '''Type, strength and age of each of the orgs in all of the worlds.'''
+        return [(type(t), t.strength, t.age) for world in self.worlds \
+                for t in world.things if isinstance(t, Org)]
+
+    def run_stats(self):
+        '''Print statistics about the orgs in all of the worlds together.'''
+        print(len(self.worlds), 'WORLDS')
+        print_stats(self.worlds[0].steps, self.org_stats())
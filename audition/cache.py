@@ -0,0 +1,234 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### An on-disk cache of the results of runs, so that a sweep over configurations
+### only simulates the configurations it hasn't seen before.  A configuration is
+### everything that decides what a run does: World.thing_specs, the constants of
+### every class in the simulation's modules, the number of steps and the seed.  Entries
+### are keyed on a hash of the configuration and of the simulation's source code,
+### so changing either one means starting over.  current_settings and apply_settings
+### carry the same class settings over to worker processes, which may not inherit them.
+###
+###   cache = ResultCache()
+###   for seed in range(20):
+###       result = run_cached(cache, seed, steps=1000)
+
+import os, json, hashlib, pickle, random, time, importlib
+from .thing import *
+from .world import World, HeadlessWorld, print_stats
+
+code_modules = ['thing.py', 'utils.py', 'world.py', 'arena.py', 'fields.py',
+                'learners.py', 'qtables.py', 'replay.py', 'monitor.py']
+"""Source files whose contents go into the code version of cache keys."""
+
+def simple(value):
+    '''A version of value that json can write, with classes and functions replaced by their names.'''
+    if isinstance(value, type) or callable(value):
+        return value.__name__
+    if isinstance(value, (list, tuple)):
+        return [simple(v) for v in value]
+    if isinstance(value, dict):
+        return dict([(simple(k) if isinstance(k, type) else str(k), simple(v)) \
+                     for k, v in value.items()])
+    return value
+
+def class_settings(cls):
+    '''The settings defined in the class itself (not inherited), by name.
+
+    Thing.n, which only counts things, isn't a setting.'''
+    return dict([(name, value) for name, value in vars(cls).items() \
+                 if not name.startswith('_') and name != 'n' and \
+                 isinstance(value, (int, float, str, bool, list, tuple, dict, type(None)))])
+
+def class_constants(cls):
+    '''The settings of the class, in a form json can write.'''
+    return dict([(name, simple(value)) for name, value in class_settings(cls).items()])
+
+def tunable_classes():
+    '''Module name.class name -> class, for every class defined in the modules of
+    code_modules, so that a new class or constant can't be left out of the key.'''
+    classes = {}
+    for name in code_modules:
+        module = importlib.import_module('.' + os.path.splitext(name)[0], __package__)
+        for value in vars(module).values():
+            if isinstance(value, type) and value.__module__ == module.__name__:
+                classes[module.__name__.split('.')[-1] + '.' + value.__name__] = value
+    return classes
+
+def current_settings():
+    '''(module name.class name, name, value) for every setting of every class in
+    code_modules, as they are now, for another process to take on with apply_settings.'''
+    return [(class_name, name, value) for class_name, cls in sorted(tunable_classes().items()) \
+            for name, value in sorted(class_settings(cls).items())]
+
+def apply_settings(settings):
+    '''Give the classes the settings from current_settings (in another process).'''
+    classes = tunable_classes()
+    for class_name, name, value in settings:
+        setattr(classes[class_name], name, value)
+
+def configuration(seed, steps=None):
+    '''Everything that decides the outcome of a run of steps steps from seed.'''
+    return {'thing_specs': simple(World.thing_specs),
+            'classes': dict([(name, class_constants(cls)) \
+                             for name, cls in tunable_classes().items()]),
+            'steps': steps or World.steps_per_run,
+            'seed': seed}
+
+def code_version(directory=None):
+    '''Hash of the source of the modules in code_modules.'''
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in code_modules:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            digest.update(name.encode())
+            with open(path, 'rb') as source:
+                digest.update(source.read())
+    return digest.hexdigest()
+
+class ResultCache:
+    '''Results of runs stored as files in a directory, keyed on their configuration.
+
+    Each entry is a json file of results and, optionally, a pickled checkpoint.
+    When the entries take up more than max_bytes, the least recently used are
+    removed; entries that haven't been used (written or read) for max_age
+    seconds are removed in any case.'''
+
+    directory = '.rl_cache'
+    """Default directory for the cache (relative to the working directory)."""
+
+    max_bytes = 100 * 1024 * 1024
+    """Most disk space the cache may use."""
+
+    max_age = 30 * 24 * 60 * 60
+    """Seconds an entry is kept for after it was last used."""
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None):
+        """Use (and if necessary make) the cache directory."""
+        self.directory = directory or ResultCache.directory
+        self.max_bytes = max_bytes or ResultCache.max_bytes
+        self.max_age = max_age or ResultCache.max_age
+        self.version = code_version()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def key(self, config):
+        '''Hash of the configuration and the code version.'''
+        text = json.dumps(config, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256((self.version + text).encode()).hexdigest()
+
+    def path(self, key, kind='json'):
+        return os.path.join(self.directory, key + '.' + kind)
+
+    def get(self, config):
+        '''The results stored for the configuration, or None.'''
+        path = self.path(self.key(config))
+        if not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.max_age:
+            self.remove(self.key(config))
+            return None
+        try:
+            with open(path) as entry:
+                result = json.load(entry)
+        except ValueError:
+            # Left half written by a crash
+            self.remove(self.key(config))
+            return None
+        # Reading counts as use for eviction
+        os.utime(path, None)
+        return result
+
+    def get_checkpoint(self, config):
+        '''The checkpoint stored for the configuration, or None.
+
+        Like the results, it is only there while the entry is (see get).'''
+        path = self.path(self.key(config), 'ckpt')
+        if self.get(config) is None or not os.path.exists(path):
+            return None
+        with open(path, 'rb') as entry:
+            return pickle.load(entry)
+
+    def put(self, config, result, checkpoint=None):
+        '''Store results (which json can write) and optionally a checkpoint for the configuration.'''
+        key = self.key(config)
+        if checkpoint is not None:
+            self.write(self.path(key, 'ckpt'), pickle.dumps(checkpoint))
+        self.write(self.path(key), json.dumps({'config': config, 'result': result}).encode())
+        self.evict()
+
+    def write(self, path, data):
+        '''Write a file so that it is either complete or not there at all.'''
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as entry:
+            entry.write(data)
+        os.replace(temporary, path)
+
+    def remove(self, key):
+        for kind in ('json', 'ckpt'):
+            if os.path.exists(self.path(key, kind)):
+                os.remove(self.path(key, kind))
+
+    def evict(self):
+        '''Remove entries unused for too long, then the least recently used until under budget.'''
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            key, kind = os.path.splitext(name)
+            if kind != '.json':
+                continue
+            used = os.path.getmtime(self.path(key))
+            if now - used > self.max_age:
+                self.remove(key)
+                continue
+            size = sum([os.path.getsize(self.path(key, k)) for k in ('json', 'ckpt') \
+                        if os.path.exists(self.path(key, k))])
+            entries.append((used, size, key))
+        total = sum([size for used, size, key in entries])
+        for used, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+def run_cached(cache, seed, steps=None, checkpoint=False):
+    '''Results of a headless run of steps steps from seed, simulated only if not in the cache.
+
+    The results are the number of steps run, the type name, strength and age
+    of each org at the end, and the world's event counts, in lists as they come
+    back from json, so they are the same whether or not they were cached.  With checkpoint,
+    the Q tables of the critters at the end are stored too.'''
+    config = configuration(seed, steps)
+    cached = cache.get(config)
+    if cached is not None:
+        return cached['result']
+    saved = random.getstate()
+    random.seed(seed)
+    world = HeadlessWorld()
+    world.stop_run = False
+    for s in range(config['steps']):
+        world.step()
+        if world.stop_run:
+            break
+    random.setstate(saved)
+    result = {'steps': world.steps,
+              'orgs': [[type(t).__name__, t.strength, t.age] for t in world.things \
+                       if isinstance(t, Org)],
+              'events': [[typ.__name__, event, count] \
+                         for (typ, event), count in sorted(world.events.items(),
+                                                           key=lambda item: (item[0][0].__name__,
+                                                                             item[0][1]))]}
+    if checkpoint:
+        checkpoint = [(type(t).__name__, t.id, t.Q) for t in world.things \
+                      if isinstance(t, Critter) and not isinstance(t.Q, ValueFunction)]
+    cache.put(config, result, checkpoint or None)
+    return result
+
+def print_result(result):
+    '''Print the statistics of a result from run_cached, like World.run_stats.'''
+    types = dict([(typ.__name__, typ) for typ in World.thing_specs])
+    print_stats(result['steps'], [(types.get(name, Thing), strength, age) \
+                                  for name, strength, age in result['orgs']])
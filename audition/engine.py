@@ -0,0 +1,98 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### A world stepped in a process of its own, controlled through a pipe.  The
+### process takes commands (step, run, stop, reinit, set the learning rate) and,
+### when asked, sends back a snapshot of what there is to draw.  While running,
+### it looks for commands between steps, so it never waits for whoever is
+### watching; the GUI client in gui.py just polls for snapshots.
+
+import random, multiprocessing
+from .thing import Critter
+from .world import HeadlessWorld
+from .cache import current_settings, apply_settings
+
+def snapshot(world):
+    '''What a display needs to draw the world: its steps, the learning rate and
+    the visible items, bottom first, as (id, kind, coords, options).'''
+    items = [(item_id, kind, coords, options) \
+             for item_id, (kind, coords, options, bbox) in world.arena_items.items() \
+             if options.get('state') != 'hidden']
+    items.sort(key=lambda item: world.arena_stacking[item[0]])
+    return {'steps': world.steps, 'eta': Critter.eta, 'items': items}
+
+def run_engine(connection, width, height, seed, settings):
+    '''Engine process: own a world, with the client's class settings, and do what
+    the commands coming in say.'''
+    apply_settings(settings)
+    random.seed(seed)
+    world = HeadlessWorld(width, height)
+    # Steps left in the current run
+    remaining = 0
+    while True:
+        if not remaining or connection.poll():
+            command = connection.recv()
+            name = command[0]
+            if name == 'step':
+                world.step()
+            elif name == 'run':
+                remaining = command[1]
+                world.stop_run = False
+            elif name == 'stop':
+                remaining = 0
+            elif name == 'reinit':
+                remaining = 0
+                world.reinit()
+            elif name == 'eta':
+                Critter.eta = command[1]
+            elif name == 'snapshot':
+                connection.send(snapshot(world))
+            else:
+                break
+            continue
+        world.step()
+        remaining -= 1
+        if not remaining or world.stop_run:
+            remaining = 0
+            world.run_stats()
+
+class EngineProcess:
+    '''The client's end of an engine process.'''
+
+    def __init__(self, width=450, height=450, seed=None):
+        """Start the engine process with a new world."""
+        self.connection, engine_connection = multiprocessing.Pipe()
+        # A spawned process would otherwise start with the default settings
+        self.process = multiprocessing.Process(target=run_engine,
+                                               args=(engine_connection, width, height, seed,
+                                                     current_settings()),
+                                               daemon=True)
+        self.process.start()
+
+    def step(self):
+        self.connection.send(('step',))
+
+    def run(self, steps):
+        '''Start running steps steps; returns at once.'''
+        self.connection.send(('run', steps))
+
+    def stop(self):
+        self.connection.send(('stop',))
+
+    def reinit(self):
+        self.connection.send(('reinit',))
+
+    def set_eta(self, eta):
+        self.connection.send(('eta', eta))
+
+    def snapshot(self):
+        '''The latest snapshot of the world (see snapshot()).'''
+        self.connection.send(('snapshot',))
+        return self.connection.recv()
+
+    def close(self):
+        """Stop the engine process."""
+        self.connection.send(('quit',))
+        self.process.join()
@@ -0,0 +1,159 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Checking that a faster way of stepping a world does exactly what the plain
+### one does.  Two engines are run side by side from the same seed, one step at
+### a time, and after every step the positions, headings, strengths, sensed
+### states and Q tables of their things (and their sounds) are compared.  The
+### first difference found is reported.
+###
+###   python -m audition.equivalence --steps 300 --seeds 1 2 3 --eta 0.5
+
+import random, argparse
+from .thing import *
+from .world import World, HeadlessWorld
+from .qtables import SparseQ
+
+class Engine:
+    '''A way of stepping a world: a world class plus class settings to run it with.
+
+    settings is a list of (class, attribute, value); the attributes are set for
+    the duration of each step and of making the world, then put back.'''
+
+    def __init__(self, name, settings=(), world_class=HeadlessWorld):
+        self.name = name
+        self.settings = list(settings)
+        self.world_class = world_class
+
+    def apply(self):
+        '''Set the engine's class attributes; return what to restore them to.'''
+        saved = [(cls, name, getattr(cls, name)) for cls, name, value in self.settings]
+        for cls, name, value in self.settings:
+            setattr(cls, name, value)
+        return saved
+
+    def restore(self, saved):
+        for cls, name, value in saved:
+            setattr(cls, name, value)
+
+reference = Engine('reference', [(World, 'clod_bitmap', False), (World, 'recycle', False),
+                                 (Critter, 'policy_cache', False), (World, 'reuse_observations', False)])
+"""The plain object-per-thing engine, with none of the caches or pools."""
+
+accelerated = Engine('accelerated')
+"""The engine with the current defaults."""
+
+class Run:
+    '''A world being stepped by an engine, with its own random numbers and thing ids.'''
+
+    def __init__(self, engine, seed, width, height):
+        self.engine = engine
+        saved_random, saved_n = random.getstate(), Thing.n
+        saved = engine.apply()
+        random.seed(seed)
+        Thing.n = 0
+        self.world = engine.world_class(width, height)
+        engine.restore(saved)
+        self.random, self.n = random.getstate(), Thing.n
+        random.setstate(saved_random)
+        Thing.n = saved_n
+
+    def step(self):
+        saved_random, saved_n = random.getstate(), Thing.n
+        saved = self.engine.apply()
+        random.setstate(self.random)
+        Thing.n = self.n
+        self.world.step()
+        self.engine.restore(saved)
+        self.random, self.n = random.getstate(), Thing.n
+        random.setstate(saved_random)
+        Thing.n = saved_n
+
+def q_rows(critter):
+    '''The rows of the critter's Q table as a dict (only visited states for a SparseQ).'''
+    Q = critter.Q
+    states = Q.states() if isinstance(Q, SparseQ) else range(len(Q))
+    return dict([(state, list(Q[state])) for state in states])
+
+def snapshot(world):
+    '''Id -> dict of what should be the same in equivalent worlds, for each thing.'''
+    things = {}
+    for thing in world.things:
+        record = {'type': type(thing).__name__, 'coords': thing.coords}
+        if isinstance(thing, Org):
+            record['strength'] = thing.strength
+            record['age'] = thing.age
+        if isinstance(thing, Critter):
+            record['heading'] = thing.heading
+            record['sensed'] = getattr(thing, 'state', None)
+            if not isinstance(thing.Q, ValueFunction):
+                record['Q'] = q_rows(thing)
+        things[thing.id] = record
+    return things
+
+def differs(a, b, tolerance):
+    '''Are two recorded values different (numbers by more than tolerance)?'''
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) > tolerance
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) != len(b) or any([differs(x, y, tolerance) for x, y in zip(a, b)])
+    if isinstance(a, dict) and isinstance(b, dict):
+        return set(a) != set(b) or any([differs(a[k], b[k], tolerance) for k in a])
+    return a != b
+
+def compare(world_a, world_b, tolerance=1e-9):
+    '''The first difference between two worlds, as (thing id, what, value a, value b), or None.'''
+    if len(world_a.sounds) != len(world_b.sounds):
+        return (None, 'sounds', len(world_a.sounds), len(world_b.sounds))
+    things_a, things_b = snapshot(world_a), snapshot(world_b)
+    for thing_id in sorted(set(things_a) | set(things_b)):
+        a, b = things_a.get(thing_id), things_b.get(thing_id)
+        if a is None or b is None:
+            return (thing_id, 'exists', a is not None, b is not None)
+        for what in sorted(a):
+            if differs(a[what], b.get(what), tolerance):
+                return (thing_id, what, a[what], b.get(what))
+    return None
+
+def check(engine_a, engine_b, seed, steps, width=450, height=450, tolerance=1e-9):
+    '''Step two engines from the same seed; return (step, difference) for the first
+    difference, or None if they stay the same for all of the steps.'''
+    run_a = Run(engine_a, seed, width, height)
+    run_b = Run(engine_b, seed, width, height)
+    difference = compare(run_a.world, run_b.world, tolerance)
+    if difference:
+        return 0, difference
+    for step in range(1, steps + 1):
+        run_a.step()
+        run_b.step()
+        difference = compare(run_a.world, run_b.world, tolerance)
+        if difference:
+            return step, difference
+    return None
+
+def report(engine_a, engine_b, seeds, steps, **options):
+    '''Check the engines for each seed and print what was found; return whether all agreed.'''
+    same = True
+    for seed in seeds:
+        result = check(engine_a, engine_b, seed, steps, **options)
+        if result is None:
+            print('seed', seed, ':', engine_a.name, 'and', engine_b.name, 'agree for', steps, 'steps')
+        else:
+            step, (thing_id, what, a, b) = result
+            print('seed', seed, ': first difference after step', step, 'in', what,
+                  'of thing', thing_id, ':', a, '!=', b)
+            same = False
+    return same
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m audition.equivalence',
+                                     description='Compare the reference and accelerated engines.')
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--eta', type=float, default=0.5, help='learning rate for both engines')
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    options = parser.parse_args()
+    Critter.eta = options.eta
+    report(reference, accelerated, options.seeds, options.steps, tolerance=options.tolerance)
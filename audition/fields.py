@@ -0,0 +1,202 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Things spread out over the world as values in a grid of square cells, rather
+### than as individual Things.
+
+import math
+from array import array
+
+class PlantField:
+    '''Plant biomass in a grid of cells, used in place of Plasmoid things.
+
+    Only cells inside the clusters of the Plasmoid specs (or all cells if there
+    are none) are fertile.  Each fertile cell can hold specs['max'] / n_fertile
+    units of biomass, where a unit is one plasmoid's worth, and starts with
+    specs['init'] / n_fertile.  Eaten cells grow back towards their capacity;
+    only cells that are still growing are updated each step.'''
+
+    cell = 20
+    """Side of a square cell of the field (about the size of a plasmoid)."""
+
+    growth = 0.02
+    """Fraction of the missing biomass that grows back in a cell each step."""
+
+    bite = 1.0
+    """Biomass eaten at once, worth Critter.food_reward; cells with at least this much feel soft."""
+
+    texture = 'soft'
+    """Texture of cells with enough biomass to be eaten."""
+
+    color = 'dark green'
+    """Color of the Canvas rectangles for edible cells."""
+
+    def __init__(self, world, specs):
+        """Make the grid for the world and fill the fertile cells."""
+        self.world = world
+        self.columns = -(-world.width // PlantField.cell)
+        self.rows = -(-world.height // PlantField.cell)
+        self.fertile = [index for index in range(self.columns * self.rows) \
+                        if self.is_fertile(index, specs.get('clusters', []))]
+        n_fertile = max(1, len(self.fertile))
+        self.capacity = float(specs.get('max', specs.get('init', 0))) / n_fertile
+        self.biomass = array('d', [0.0]) * (self.columns * self.rows)
+        # Cells that haven't grown back to capacity yet
+        self.growing = set()
+        # Cell index -> Canvas rectangle
+        self.graphics = {}
+        for index in self.fertile:
+            self.biomass[index] = float(specs.get('init', 0)) / n_fertile
+            self.growing.add(index)
+            x, y = self.cell_corner(index)
+            self.graphics[index] = world.create_rectangle(x, y, x + PlantField.cell,
+                                                          y + PlantField.cell,
+                                                          fill=PlantField.color, outline='')
+            world.tag_lower(self.graphics[index])
+            self.show(index)
+
+    def cell_corner(self, index):
+        '''Coordinates of the top left corner of a cell.'''
+        return (index % self.columns) * PlantField.cell, (index // self.columns) * PlantField.cell
+
+    def is_fertile(self, index, clusters):
+        '''Is the center of the cell inside one of the clusters (or are there none)?'''
+        if not clusters:
+            return True
+        x, y = self.cell_corner(index)
+        x, y = x + PlantField.cell / 2.0, y + PlantField.cell / 2.0
+        for (c_x, c_y), radius in clusters:
+            if (x - c_x) ** 2 + (y - c_y) ** 2 <= radius * radius:
+                return True
+        return False
+
+    def cell_index(self, x, y):
+        '''Index of the cell that position x, y is in.'''
+        return (int(y // PlantField.cell) % self.rows) * self.columns + \
+               int(x // PlantField.cell) % self.columns
+
+    def show(self, index):
+        '''Show the cell's rectangle only if the cell has something to eat.'''
+        self.world.itemconfigure(self.graphics[index],
+                                 state='normal' if self.biomass[index] >= PlantField.bite \
+                                 else 'hidden')
+        # What the cell feels like may have changed
+        self.world.mark_region(self.cell_region(index))
+
+    def cell_region(self, index):
+        '''The square x1, y1, x2, y2 that a cell covers.'''
+        x, y = self.cell_corner(index)
+        return x, y, x + PlantField.cell, y + PlantField.cell
+
+    def feels(self, x, y):
+        '''The texture felt at x, y, or None.'''
+        if self.biomass[self.cell_index(x, y)] >= PlantField.bite:
+            return PlantField.texture
+        return None
+
+    def eat(self, x, y):
+        '''Take a bite from the cell at x, y if there's enough; return the biomass eaten.'''
+        index = self.cell_index(x, y)
+        if self.biomass[index] < PlantField.bite:
+            return 0.0
+        self.biomass[index] -= PlantField.bite
+        self.growing.add(index)
+        self.show(index)
+        return PlantField.bite
+
+    def grow(self):
+        '''Let the cells that have been eaten grow back a bit.'''
+        for index in list(self.growing):
+            old = self.biomass[index]
+            new = old + PlantField.growth * (self.capacity - old)
+            if self.capacity - new < 0.001:
+                new = self.capacity
+                self.growing.discard(index)
+            self.biomass[index] = new
+            if (old >= PlantField.bite) != (new >= PlantField.bite):
+                self.show(index)
+
+    def total(self):
+        '''Total biomass in the field.'''
+        return sum(self.biomass)
+
+    def destroy(self):
+        '''Get rid of the Canvas rectangles.'''
+        for graphic in self.graphics.values():
+            self.world.delete(graphic)
+
+class SoundField:
+    '''Loudness of the sounds in the world in a grid of cells.
+
+    A sound adds to the loudness of the cell it is made in.  Every step the
+    loudness of each cell decays and part of it spreads to the four neighbouring
+    cells (the world wraps around).  Only cells that are loud enough to matter
+    are kept, so the cost of a step depends on how much of the world is noisy,
+    and the cost of hearing doesn't depend on the number of sounds at all.'''
+
+    cell = 25
+    """Side of a square cell of the field; a listener reads the 3 x 3 cells around it."""
+
+    loudness = 1.0
+    """Loudness a sound adds to its cell."""
+
+    decay = 0.6
+    """Fraction of its loudness a cell keeps from one step to the next."""
+
+    diffusion = 0.2
+    """Fraction of a cell's loudness that spreads to its neighbours each step."""
+
+    floor = 0.01
+    """Loudness below which a cell is considered silent."""
+
+    def __init__(self, world):
+        """Make an empty (silent) field covering the world."""
+        self.world = world
+        self.columns = -(-world.width // SoundField.cell)
+        self.rows = -(-world.height // SoundField.cell)
+        # (column, row) -> loudness, for cells that aren't silent
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        '''The (column, row) of the cell that position x, y is in.'''
+        return int(x // SoundField.cell) % self.columns, int(y // SoundField.cell) % self.rows
+
+    def get(self, column, row):
+        '''Loudness of a cell, wrapping around the edges of the world.'''
+        return self.cells.get((column % self.columns, row % self.rows), 0.0)
+
+    def add(self, coords):
+        '''Make a sound at coords.'''
+        cell = self.cell_of(*coords)
+        self.cells[cell] = self.cells.get(cell, 0.0) + SoundField.loudness
+
+    def step(self):
+        '''Let the sounds decay and spread.'''
+        spread = SoundField.diffusion / 4.0
+        new = {}
+        for (column, row), value in self.cells.items():
+            new[(column, row)] = new.get((column, row), 0.0) + \
+                                 value * SoundField.decay * (1.0 - SoundField.diffusion)
+            for neighbour in ((column + 1) % self.columns, row), ((column - 1) % self.columns, row), \
+                             (column, (row + 1) % self.rows), (column, (row - 1) % self.rows):
+                new[neighbour] = new.get(neighbour, 0.0) + value * SoundField.decay * spread
+        self.cells = dict([(cell, value) for cell, value in new.items() \
+                           if value >= SoundField.floor])
+
+    def listen(self, x, y):
+        '''Loudness and direction (counterclockwise degrees) of what is heard at x, y.
+
+        The loudness is that of the loudest of the 3 x 3 cells around x, y and
+        the direction is that in which loudness increases across them.  The
+        direction is None if there is nothing to hear or no direction to it.'''
+        column, row = self.cell_of(x, y)
+        around = [[self.get(column + dx, row + dy) for dx in (-1, 0, 1)] for dy in (-1, 0, 1)]
+        loudest = max([max(r) for r in around])
+        x_slope = sum([r[2] - r[0] for r in around])
+        # Rows go down the screen, angles go counterclockwise
+        y_slope = sum(around[0]) - sum(around[2])
+        if loudest < SoundField.floor or (not x_slope and not y_slope):
+            return loudest, None
+        return loudest, math.degrees(math.atan2(y_slope, x_slope)) % 360
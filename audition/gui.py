@@ -0,0 +1,166 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### The world displayed on a Tk Canvas, with buttons to step, run, reinitialize
+### and turn learning on and off.  This is the only module that imports tkinter.
+###
+### WorldFrame steps the world inside the Tk event loop, so the window is frozen
+### during a run.  RemoteWorldFrame leaves the world to an engine process (see
+### engine.py) and only draws the snapshots it asks the engine for.
+
+from tkinter import *
+from .thing import *
+from .world import World
+from .engine import EngineProcess
+
+class WorldFrame(Frame):
+    '''A Frame in which to display the world.'''
+
+    def __init__(self, root, width=450, height=450):
+        '''Give the frame a canvas, a world, and dimensions and display it.'''
+        Frame.__init__(self, root)
+        self.world = CanvasWorld(self, width=width, height=height)
+        root.title('The World')
+        self.step_button = Button(self, text='Step', command=self.world.step)
+        self.step_button.grid(row=1, column=0)
+        self.run_button = Button(self, text='Run', command=self.world.run)
+        self.run_button.grid(row=1, column=1)
+        self.reinit_button = Button(self, text='Reinit', command=self.world.reinit)
+        self.reinit_button.grid(row=1, column=2)
+        self.learn_button = Button(self, text='Learn')
+        self.learn_button.grid(row=1, column=3)
+        self.learn_button.bind('<Button-1>', self.world.learn)
+        self.grid()
+
+class CanvasWorld(World, Canvas):
+    """A World whose things are drawn on a Tk Canvas."""
+
+    def __init__(self, frame, width=450, height=450):
+        """Initialize dimensions and create things."""
+        Canvas.__init__(self, frame, bg=World.color, width=width, height=height)
+        self.frame = frame
+        self.setup(width, height)
+##        self.bind('<Control-Button-1>', self.add_diskoid_at)
+##        self.bind('<Option-Button-1>', self.add_clod_at)
+##        self.bind('<Shift-Button-1>', self.add_plasmoid_at)
+        self.grid(row=0, columnspan=4)
+
+    def learn(self, event):
+        """Handler for the Learn button.
+        Binds the button to the other handler."""
+        print('Starting learning')
+        self.frame.learn_button.config(text="Don't learn")
+        Critter.eta = 0.5
+        self.frame.learn_button.bind('<Button-1>', self.dont_learn)
+
+    def dont_learn(self, event):
+        """Handler for the Learn button.
+        Binds the button to the other handler."""
+        print('Turning off learning')
+        self.frame.learn_button.config(text="Learn")
+        Critter.eta = 0.0
+        self.frame.learn_button.bind('<Button-1>', self.learn)
+
+    # Handlers for automatically adding things in event positions.
+
+##    def add_diskoid_at(self, event):
+##        """Add a diskoid to the world where the event happens."""
+##        self.add_thing(Diskoid, coords=(event.x, event.y))
+
+##    def add_clod_at(self, event):
+##        """Add a clod to the world where the event happens."""
+##        self.add_thing(Clod, coords=(event.x, event.y))
+##
+##    def add_plasmoid_at(self, event):
+##        """Add a clod to the world where the event happens."""
+##        self.add_thing(Plasmoid, coords=(event.x, event.y))
+
+class RemoteWorldFrame(Frame):
+    '''A Frame that displays a world stepped by an engine process.'''
+
+    poll_interval = 33
+    """Milliseconds between snapshots."""
+
+    def __init__(self, root, width=450, height=450, seed=None):
+        '''Start the engine, and make the canvas and the buttons that send it commands.'''
+        Frame.__init__(self, root)
+        self.root = root
+        self.engine = EngineProcess(width, height, seed)
+        self.canvas = Canvas(self, bg=World.color, width=width, height=height)
+        self.canvas.grid(row=0, columnspan=5)
+        root.title('The World')
+        self.step_button = Button(self, text='Step', command=self.engine.step)
+        self.step_button.grid(row=1, column=0)
+        self.run_button = Button(self, text='Run', command=self.run)
+        self.run_button.grid(row=1, column=1)
+        self.stop_button = Button(self, text='Stop', command=self.engine.stop)
+        self.stop_button.grid(row=1, column=2)
+        self.reinit_button = Button(self, text='Reinit', command=self.engine.reinit)
+        self.reinit_button.grid(row=1, column=3)
+        self.learn_button = Button(self, text='Learn', command=self.toggle_learning)
+        self.learn_button.grid(row=1, column=4)
+        # Engine item id -> Canvas item id
+        self.items = {}
+        self.eta = 0.0
+        self.grid()
+        self.poll()
+
+    def run(self):
+        self.engine.run(World.steps_per_run)
+
+    def toggle_learning(self):
+        '''Handler for the Learn button: turn learning on or off in the engine.'''
+        if self.eta:
+            print('Turning off learning')
+            self.engine.set_eta(0.0)
+        else:
+            print('Starting learning')
+            self.engine.set_eta(0.5)
+
+    def poll(self):
+        '''Draw the engine's latest snapshot, and do it again in a little while.'''
+        self.draw(self.engine.snapshot())
+        self.after(RemoteWorldFrame.poll_interval, self.poll)
+
+    def draw(self, snapshot):
+        '''Make the Canvas items match the items in the snapshot.'''
+        self.root.title('The World -- step %d' % snapshot['steps'])
+        self.eta = snapshot['eta']
+        self.learn_button.config(text="Don't learn" if self.eta else 'Learn')
+        current = set()
+        for item_id, kind, coords, options in snapshot['items']:
+            current.add(item_id)
+            canvas_id = self.items.get(item_id)
+            if canvas_id is None:
+                create = getattr(self.canvas, 'create_' + kind)
+                canvas_id = self.items[item_id] = create(*coords, **options)
+            else:
+                self.canvas.coords(canvas_id, *coords)
+                self.canvas.itemconfigure(canvas_id, **options)
+            # Items come bottom first
+            self.canvas.tag_raise(canvas_id)
+        for item_id in list(self.items):
+            if item_id not in current:
+                self.canvas.delete(self.items.pop(item_id))
+
+    def destroy(self):
+        self.engine.close()
+        Frame.destroy(self)
+
+def make_gui_world(width=450, height=450):
+    '''A CanvasWorld in a WorldFrame in a new Tk window.'''
+    return WorldFrame(Tk(), width, height).world
+
+def main(width=450, height=450, seed=None, remote=True):
+    '''Open the window and run the GUI until it is closed.
+
+    With remote, the world runs in an engine process; otherwise it is stepped
+    inside the event loop by a WorldFrame.'''
+    root = Tk()
+    if remote:
+        frame = RemoteWorldFrame(root, width, height, seed)
+    else:
+        frame = WorldFrame(root, width, height)
+    root.mainloop()
@@ -0,0 +1,137 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Q values computed from a sensor's state features rather than looked up in a
+### table.  One value function is shared by all of the critters of a class: each
+### critter's TD updates are collected during a step and applied together at the
+### end of it, and the Q values for a state are only computed once per step.
+
+import random
+from . import utils
+
+class ValueFunction:
+    '''Q values for the states of one kind of sensor, shared by a class of critters.
+
+    Used like a Q table for reading, as Q[state][action]; learning goes through
+    update() and flush() instead of assigning to the table.'''
+
+    def __init__(self, sensor, n_actions):
+        """Start out with every Q value 0."""
+        self.encode = sensor.state_features
+        self.n_inputs = sensor.get_n_state_features()
+        self.n_actions = n_actions
+        # State -> Q values with the current weights
+        self.cache = {}
+        # (inputs, action, target) for the updates of this step
+        self.updates = []
+        self.init_weights()
+
+    def inputs(self, state):
+        '''The state's features, scaled to length 1.'''
+        features = self.encode(state)
+        if any(features):
+            utils.normalize(features)
+        return features
+
+    def __getitem__(self, state):
+        values = self.cache.get(state)
+        if values is None:
+            values = self.cache[state] = self.forward(self.inputs(state))
+        return values
+
+    def update(self, state, action, target):
+        '''Ask for the Q value of state and action to be moved towards target.'''
+        self.updates.append((state, action, target))
+
+    def flush(self, eta):
+        '''Apply the updates asked for since the last flush, with learning rate eta.'''
+        if self.updates and eta:
+            # Averaging over the step keeps eta meaning the same however many critters there are
+            self.learn([(self.inputs(state), action, target - self[state][action]) \
+                        for state, action, target in self.updates], eta / len(self.updates))
+            self.cache = {}
+        self.updates = []
+
+    def init_weights(self):
+        pass
+
+    def forward(self, inputs):
+        '''Q values of all actions for the inputs.'''
+        return [0.0] * self.n_actions
+
+    def learn(self, errors, eta):
+        '''Change the weights given a list of (inputs, action, error).'''
+        pass
+
+class LinearQ(ValueFunction):
+    '''Q values that are weighted sums of the features (plus a bias).'''
+
+    def init_weights(self):
+        self.weights = [[0.0] * (self.n_inputs + 1) for a in range(self.n_actions)]
+
+    def forward(self, inputs):
+        inputs = inputs + [1.0]
+        return [utils.dot_product(weights, inputs) for weights in self.weights]
+
+    def learn(self, errors, eta):
+        # Changes for the whole step are summed, then applied at once; inputs plus
+        # bias have a squared length of 2, so halving eta keeps a full step from overshooting
+        eta /= 2.0
+        changes = [[0.0] * (self.n_inputs + 1) for a in range(self.n_actions)]
+        for inputs, action, error in errors:
+            row = changes[action]
+            for i, x in enumerate(inputs + [1.0]):
+                row[i] += error * x
+        for weights, row in zip(self.weights, changes):
+            for i in range(len(weights)):
+                weights[i] += eta * row[i]
+
+class MLPQ(ValueFunction):
+    '''Q values from a network with one layer of sigmoid hidden units.'''
+
+    n_hidden = 8
+    """Number of hidden units."""
+
+    seed = 0
+    """Seed for the initial weights (which don't use the world's random numbers)."""
+
+    def init_weights(self):
+        generator = random.Random(MLPQ.seed)
+        self.hidden_weights = [[generator.uniform(-0.5, 0.5) for i in range(self.n_inputs + 1)] \
+                               for h in range(MLPQ.n_hidden)]
+        self.output_weights = [[0.0] * (MLPQ.n_hidden + 1) for a in range(self.n_actions)]
+
+    def hidden(self, inputs):
+        '''Activations of the hidden units (plus a bias).'''
+        inputs = inputs + [1.0]
+        return [utils.sigmoid(utils.dot_product(weights, inputs), 0.0, 1.0) \
+                for weights in self.hidden_weights] + [1.0]
+
+    def forward(self, inputs):
+        hidden = self.hidden(inputs)
+        return [utils.dot_product(weights, hidden) for weights in self.output_weights]
+
+    def learn(self, errors, eta):
+        # Backpropagate each error from the single output it concerns; apply the sum.
+        # Like LinearQ, scale eta by the largest squared length of the hidden layer.
+        eta /= MLPQ.n_hidden + 1.0
+        hidden_changes = [[0.0] * (self.n_inputs + 1) for h in range(MLPQ.n_hidden)]
+        output_changes = [[0.0] * (MLPQ.n_hidden + 1) for a in range(self.n_actions)]
+        for inputs, action, error in errors:
+            hidden = self.hidden(inputs)
+            inputs = inputs + [1.0]
+            for h, activation in enumerate(hidden):
+                output_changes[action][h] += error * activation
+            for h in range(MLPQ.n_hidden):
+                delta = error * self.output_weights[action][h] * utils.sigmoid_slope(hidden[h])
+                for i, x in enumerate(inputs):
+                    hidden_changes[h][i] += delta * x
+        for weights, changes in zip(self.hidden_weights + self.output_weights,
+                                    hidden_changes + output_changes):
+            for i in range(len(weights)):
+                weights[i] += eta * changes[i]
+
+value_functions = {'linear': LinearQ, 'mlp': MLPQ}
+"""Kinds of value function, by the names used for Critter.value_function."""
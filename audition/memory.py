@@ -0,0 +1,149 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Watching the memory of a long run for leaks.  A MemoryTracker is one of a
+### world's observers: every few steps it records the sizes of the world's
+### containers (things, graphic_objs, sounds, the feature lists of the sensors,
+### ...) and, with tracemalloc, the memory allocated by each module of the
+### package.  A size that has grown at every one of the last few samples is
+### flagged, and for growing modules the call sites where the new memory was
+### allocated are reported.  Caches that are still filling up (the policies of
+### the states critters have been in) grow too until they reach their limits, so
+### a flag is a place to look, not a verdict.  tracemalloc slows a run down a lot, so this is for
+### hunting leaks, not for every run.
+###
+###   tracker = MemoryTracker(world, every=100)
+###   tracker.attach()
+###   world.run()                # the report is printed with the run's statistics
+
+import os, tracemalloc
+from collections import deque
+from .thing import Critter
+
+package = os.path.dirname(os.path.abspath(__file__))
+"""Directory of the package; memory allocated by its modules is charged to them."""
+
+def subsystem(filename):
+    '''The module of the package that a file is, or 'other'.'''
+    if os.path.dirname(os.path.abspath(filename)) == package:
+        return os.path.splitext(os.path.basename(filename))[0]
+    return 'other'
+
+class MemoryTracker:
+    '''Samples of container sizes and allocated memory, and a test for steady growth.'''
+
+    every = 100
+    """Steps between samples."""
+
+    window = 5
+    """Samples in a row over which something has to have grown to be flagged."""
+
+    frames = 5
+    """Frames of traceback that tracemalloc keeps for each allocation."""
+
+    top = 5
+    """Growing call sites reported for each growing module."""
+
+    def __init__(self, world, every=None):
+        """Get ready to sample world every self.every steps."""
+        self.world = world
+        self.every = every or MemoryTracker.every
+        # (steps, {name: size}) for each sample
+        self.samples = []
+        # The tracemalloc snapshots of the last window + 1 samples
+        self.snapshots = deque(maxlen=self.window + 1)
+        # Whether the tracker started tracemalloc (and so should stop it)
+        self.started = False
+
+    def attach(self):
+        '''Start tracing allocations and sampling the world.'''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started = True
+        self.world.observers.append(self)
+        self.sample()
+
+    def detach(self):
+        '''Stop sampling the world (and tracing, if the tracker started it).'''
+        if self in self.world.observers:
+            self.world.observers.remove(self)
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    def after_step(self, world):
+        if world.steps % self.every == 0:
+            self.sample()
+
+    ## Sampling
+
+    def sizes(self):
+        '''Name -> current size of each of the world's containers that might leak.'''
+        world = self.world
+        sizes = {'things': len(world.things),
+                 'graphic_objs': len(world.graphic_objs),
+                 'sounds': len(world.sound_field.cells) if world.sound_field else len(world.sounds),
+                 'pools': sum([len(pool) for pool in world.pools.values()])}
+        if hasattr(world, 'arena_items'):
+            sizes['canvas_items'] = len(world.arena_items)
+        # The longest feature list of each class of sensor; it shouldn't change at all
+        for thing in world.agents:
+            if isinstance(thing, Critter):
+                name = type(thing.sensor).__name__ + ' features'
+                sizes[name] = max(sizes.get(name, 0), len(thing.sensor.features))
+        return sizes
+
+    def sample(self):
+        '''Record the sizes and the memory allocated by each module of the package.'''
+        sizes = self.sizes()
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+            for stat in snapshot.statistics('filename'):
+                name = subsystem(stat.traceback[-1].filename) + ' bytes'
+                sizes[name] = sizes.get(name, 0) + stat.size
+            self.snapshots.append(snapshot)
+        self.samples.append((self.world.steps, sizes))
+
+    ## Growth
+
+    def growing(self):
+        '''Names of the sizes that have grown at each of the last window samples.'''
+        if len(self.samples) <= self.window:
+            return []
+        recent = [sizes for steps, sizes in self.samples[-(self.window + 1):]]
+        return sorted([name for name in recent[-1] \
+                       if all([name in sizes for sizes in recent]) and \
+                       all([a[name] < b[name] for a, b in zip(recent, recent[1:])])])
+
+    def call_sites(self, module):
+        '''The top statistics (by growth) for the call sites in module that allocated
+        memory over the last window samples.'''
+        if len(self.snapshots) < 2:
+            return []
+        stats = self.snapshots[-1].compare_to(self.snapshots[0], 'traceback')
+        return [stat for stat in stats \
+                if stat.size_diff > 0 and subsystem(stat.traceback[-1].filename) == module][:self.top]
+
+    def report(self):
+        '''Print the latest sizes, and what has been growing and where.'''
+        if not self.samples:
+            return
+        steps, sizes = self.samples[-1]
+        first_steps, first = self.samples[0]
+        print('MEMORY TRACKING AFTER', steps, 'STEPS')
+        for name in sorted(sizes):
+            print('  %-24s %10d  (%d at step %d)' % (name, sizes[name], first.get(name, 0), first_steps))
+        growing = self.growing()
+        if not growing:
+            print('Nothing grew at each of the last', self.window, 'samples')
+        for name in growing:
+            before = self.samples[-(self.window + 1)][1][name]
+            print('GROWING:', name, before, '->', sizes[name], 'over the last', self.window, 'samples')
+            if name.endswith(' bytes'):
+                for stat in self.call_sites(name[:-len(' bytes')]):
+                    print('    +%d bytes in %d blocks, allocated at' % (stat.size_diff, stat.count_diff))
+                    for line in stat.traceback.format(most_recent_first=True):
+                        print('     ', line)
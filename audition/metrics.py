@@ -0,0 +1,125 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Live statistics for a running world, served as json over HTTP on a local
+### port by a background thread.  The server is one of the world's observers:
+### every few steps it makes a new snapshot of the statistics, a plain dict, and
+### the thread only ever sends the latest snapshot, so a slow or frequent client
+### never holds up the simulation.
+###
+###   server = MetricsServer(world, port=8765)
+###   server.start()
+###   world.run()                # meanwhile: curl http://127.0.0.1:8765/metrics
+
+import json, threading, time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from .thing import Org, Critter
+
+class MetricsServer:
+    '''Snapshots of a world's statistics, and an HTTP server that hands them out.'''
+
+    every = 10
+    """Steps between snapshots."""
+
+    def __init__(self, world, port=0, host='127.0.0.1'):
+        """Get ready to serve statistics for world on host and port (0 for any free port)."""
+        self.world = world
+        self.host = host
+        self.port = port
+        self.snapshot = {'steps': world.steps}
+        self.server = None
+        self.thread = None
+        # Step, time and event counts at the last snapshot, for rates
+        self.last_steps = world.steps
+        self.last_time = time.time()
+        self.last_events = dict(world.events)
+        self.last_phase_times = {}
+
+    def start(self):
+        '''Start serving and taking snapshots; return the port being served on.'''
+        handler = type('Handler', (MetricsHandler,), {'metrics': self})
+        self.server = HTTPServer((self.host, self.port), handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        if self.world.phase_times is None:
+            self.world.phase_times = {}
+        self.world.observers.append(self)
+        self.take_snapshot()
+        return self.port
+
+    def stop(self):
+        '''Stop serving and taking snapshots.'''
+        if self in self.world.observers:
+            self.world.observers.remove(self)
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def after_step(self, world):
+        if world.steps % self.every == 0:
+            self.take_snapshot()
+
+    def take_snapshot(self):
+        '''Work out the current statistics and make them the ones served.'''
+        world = self.world
+        now = time.time()
+        steps = world.steps - self.last_steps
+        elapsed = now - self.last_time
+        species = {}
+        for thing in world.things:
+            if isinstance(thing, Org):
+                stats = species.setdefault(type(thing).__name__,
+                                           {'n': 0, 'strength': 0.0, 'age': 0.0})
+                stats['n'] += 1
+                stats['strength'] += thing.strength
+                stats['age'] += thing.age
+        for stats in species.values():
+            stats['mean_strength'] = stats.pop('strength') / stats['n']
+            stats['mean_age'] = stats.pop('age') / stats['n']
+        # Events per critter per step since the last snapshot, for every species of critter
+        for thing in world.agents:
+            typ = type(thing)
+            if isinstance(thing, Critter) and 'eat_rate' not in species[typ.__name__]:
+                for event in ('eat', 'bump'):
+                    new = world.events[typ, event] - self.last_events.get((typ, event), 0)
+                    species[typ.__name__][event + '_rate'] = \
+                        float(new) / steps / species[typ.__name__]['n'] if steps else 0.0
+        phases = {}
+        if world.phase_times:
+            for phase, total in world.phase_times.items():
+                if steps:
+                    phases[phase] = (total - self.last_phase_times.get(phase, 0.0)) / steps
+            self.last_phase_times = dict(world.phase_times)
+        self.snapshot = {'steps': world.steps,
+                         'steps_per_second': steps / elapsed if elapsed > 0 else 0.0,
+                         'species': species,
+                         'sounds': len(world.sound_field.cells) if world.sound_field \
+                                   else len(world.sounds),
+                         'seconds_per_step': phases,
+                         'time': now}
+        self.last_steps, self.last_time = world.steps, now
+        self.last_events = dict(world.events)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    '''Sends the latest snapshot of its MetricsServer (set as metrics) as json.'''
+
+    metrics = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = json.dumps(self.metrics.snapshot).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep requests out of the run's output
+        pass
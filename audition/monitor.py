@@ -0,0 +1,109 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Watching a learning run to tell when the critters have stopped improving.
+### A monitor is one of a world's observers: the world calls its after_step()
+### at the end of every step, and World.run stops early once an observer has
+### set the world's stop_run.
+
+from collections import deque
+from .thing import Critter
+
+class ConvergenceMonitor:
+    '''Rolling statistics for each class of critter, with a plateau test.
+
+    Every step the monitor records, for each class, the mean reinforcement,
+    eats and bumps per critter, mean strength and mean size of the changes to
+    Q values.  Learning has converged for a class when, over the last window
+    steps, Q values have hardly changed and the mean reinforcement is within
+    tolerance of that of the window before.  The run is stopped once every
+    class has converged.'''
+
+    window = 100
+    """Steps over which rolling statistics are kept."""
+
+    min_steps = 300
+    """Steps before convergence is first checked."""
+
+    tolerance = 0.05
+    """Largest change in mean reinforcement (relative, or absolute below 1) on a plateau."""
+
+    q_tolerance = 0.01
+    """Largest mean size of a change to a Q value on a plateau."""
+
+    def __init__(self, stop=True):
+        """Start with no history; if stop is true, stop the run on convergence."""
+        self.stop = stop
+        # Critter class -> deque of per-step records (see record)
+        self.history = {}
+        # (Critter class, event) counts already seen, to get each step's events
+        self.seen = {}
+        self.converged_at = None
+
+    def after_step(self, world):
+        '''Record the step that has just happened and stop the run if learning is done.'''
+        self.record(world)
+        if self.converged_at is None and world.steps >= self.min_steps and self.converged():
+            self.converged_at = world.steps
+            if self.stop:
+                world.stop_run = True
+
+    def new_events(self, world, typ, event):
+        '''How many of the event the critters of class typ have had since the last step.'''
+        total = world.events[typ, event]
+        new = total - self.seen.get((typ, event), 0)
+        self.seen[typ, event] = total
+        return new
+
+    def record(self, world):
+        '''Add a record for each class of critter to its history.'''
+        totals = {}
+        for critter in world.agents:
+            if isinstance(critter, Critter):
+                total = totals.setdefault(type(critter), [0, 0.0, 0.0])
+                total[0] += 1
+                total[1] += getattr(critter, 'last_reinforcement', 0.0)
+                total[2] += critter.strength
+        for typ, (n, reinforcement, strength) in totals.items():
+            updates = self.new_events(world, typ, 'update')
+            if typ not in self.history:
+                self.history[typ] = deque(maxlen=2 * self.window)
+            self.history[typ].append({'reinforcement': reinforcement / n,
+                                      'eats': self.new_events(world, typ, 'eat') / float(n),
+                                      'bumps': self.new_events(world, typ, 'bump') / float(n),
+                                      'strength': strength / n,
+                                      'q_change': self.new_events(world, typ, 'q_change') / \
+                                                  max(1, updates)})
+
+    def mean(self, typ, name, last=None):
+        '''Mean of a statistic for critter class typ over the last window (or last) steps.'''
+        records = list(self.history[typ])[-(last or self.window):]
+        return sum([record[name] for record in records]) / max(1, len(records))
+
+    def converged(self):
+        '''Have all of the classes of critter reached a plateau?'''
+        if not self.history:
+            return False
+        for typ, records in self.history.items():
+            if len(records) < 2 * self.window:
+                return False
+            recent = self.mean(typ, 'reinforcement')
+            before = sum([record['reinforcement'] for record in list(records)[:self.window]]) / \
+                     self.window
+            if abs(recent - before) > self.tolerance * max(1.0, abs(before)):
+                return False
+            if self.mean(typ, 'q_change') > self.q_tolerance:
+                return False
+        return True
+
+    def report(self):
+        '''Print the rolling statistics for each class of critter.'''
+        if self.converged_at is not None:
+            print('CONVERGED AFTER', self.converged_at, 'STEPS')
+        for typ in self.history:
+            print(typ.__name__ + ':  reinforcement %.3f  eats %.3f  bumps %.3f  strength %d  '
+                  'Q change %.4f' % (self.mean(typ, 'reinforcement'), self.mean(typ, 'eats'),
+                                     self.mean(typ, 'bumps'), self.mean(typ, 'strength'),
+                                     self.mean(typ, 'q_change')))
@@ -0,0 +1,50 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Q tables other than the plain list of lists made by Critter.init_Q.
+
+from array import array
+from collections import OrderedDict
+
+class SparseQ:
+    '''A Q table that only has rows for the states that have been visited.
+
+    Used like the list of lists, as Q[state][action].  Looking up a state that
+    has no row yet makes one with every action at default.  Rows are compact
+    arrays of doubles.  If limit is set, only the limit most recently used rows
+    are kept; a row that is dropped starts over at default when it is next used.'''
+
+    def __init__(self, n_actions, default=0.0, limit=None):
+        """An empty table for n_actions actions."""
+        self.n_actions = n_actions
+        self.default = default
+        self.limit = limit
+        # State -> row, least recently used first
+        self.rows = OrderedDict()
+
+    def __getitem__(self, state):
+        row = self.rows.get(state)
+        if row is None:
+            row = array('d', [self.default]) * self.n_actions
+            self.rows[state] = row
+            if self.limit and len(self.rows) > self.limit:
+                self.rows.popitem(last=False)
+        elif self.limit:
+            self.rows.move_to_end(state)
+        return row
+
+    def __contains__(self, state):
+        return state in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def states(self):
+        '''The states that have rows, in order.'''
+        return sorted(self.rows.keys())
+
+    def clear(self):
+        '''Forget all of the rows.'''
+        self.rows.clear()
@@ -0,0 +1,219 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Pictures of a world without a display.  A Renderer draws the items of a
+### world's Arena (things, mouths, feelers, plant cells) in display list order,
+### plus the hearing radius of each Pentoid and the sounds, into an RGB buffer,
+### and writes the frames as numbered PNG files or one raw RGB stream.  It is an
+### observer of the world, so it only draws every few steps.
+###
+###   world = make_world(seed=1)
+###   Renderer(world, 'frames', every=5).attach()
+###   world.run()
+###
+### A raw stream can be turned into a video with
+###   ffmpeg -f rawvideo -pix_fmt rgb24 -s 450x450 -r 30 -i frames.rgb run.mp4
+
+import os, math, struct, zlib
+from .thing import *
+
+colors = {'black': (0, 0, 0), 'white': (255, 255, 255), 'red': (255, 0, 0),
+          'green': (0, 255, 0), 'dark green': (0, 100, 0), 'blue': (0, 0, 255),
+          'yellow': (255, 255, 0), 'orange': (255, 165, 0), 'magenta': (255, 0, 255),
+          'brown': (165, 42, 42)}
+"""RGB values of the Tk color names used by the things."""
+
+def rgb(color):
+    '''The RGB bytes of a Tk color name (or '#rrggbb'), gray if unknown.'''
+    if color.startswith('#') and len(color) == 7:
+        return bytes([int(color[i:i + 2], 16) for i in (1, 3, 5)])
+    return bytes(colors.get(color, (128, 128, 128)))
+
+def png(width, height, pixels, level=1):
+    '''A PNG file (as bytes) for an RGB buffer of width x height pixels.'''
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + \
+               struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    row = width * 3
+    # Each row starts with filter type 0
+    raw = b''.join([b'\x00' + bytes(pixels[y * row:(y + 1) * row]) for y in range(height)])
+    return b'\x89PNG\r\n\x1a\n' + \
+           chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) + \
+           chunk(b'IDAT', zlib.compress(raw, level)) + chunk(b'IEND', b'')
+
+class Renderer:
+    '''Draws a world with an Arena for a canvas into frames and writes them out.
+
+    Shapes are filled a row at a time, from the spans worked out once for each
+    size of oval and each angle of an arc's mouth.  Outlines aren't drawn.'''
+
+    every = 10
+    """Steps between frames."""
+
+    hearing_color = 'orange'
+    """Color of the circle showing how far a Pentoid can hear."""
+
+    sound_color = 'white'
+    """Color of sounds."""
+
+    def __init__(self, world, directory='frames', raw=False, every=None):
+        """Write frames of world to directory, as PNG files or (with raw) one RGB stream."""
+        self.world = world
+        self.directory = directory
+        self.raw = raw
+        self.every = every or Renderer.every
+        self.width, self.height = int(world.width), int(world.height)
+        self.background = rgb(world.color) * (self.width * self.height)
+        self.frames = 0
+        # (width, height, start, extent) -> spans; see shape_spans
+        self.spans = {}
+        # Radius -> offsets of the points of a circle
+        self.rings = {}
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        if raw:
+            # Start a new stream; write() appends this run's frames to it
+            open(self.stream_path(), 'wb').close()
+
+    def attach(self):
+        '''Start drawing the world every self.every steps.'''
+        self.world.observers.append(self)
+
+    def after_step(self, world):
+        if world.steps % self.every == 0:
+            self.write(self.render())
+
+    ## Drawing
+
+    def render(self):
+        '''A new frame: a bytearray of RGB pixels, row by row.'''
+        pixels = bytearray(self.background)
+        arena = self.world
+        for item_id in sorted(arena.arena_items, key=arena.arena_stacking.get):
+            kind, coords, options, bbox = arena.arena_items[item_id]
+            if options.get('state') == 'hidden':
+                continue
+            color = rgb(options.get('fill') or 'white')
+            if kind == 'line':
+                self.line(pixels, coords[0], coords[1], coords[2], coords[3], color)
+            elif kind == 'rectangle':
+                self.rectangle(pixels, coords, color)
+            elif kind == 'oval':
+                self.ellipse(pixels, coords, color)
+            elif kind == 'arc':
+                self.ellipse(pixels, coords, color, float(options.get('start', 0)),
+                             float(options.get('extent', 360)))
+        self.hearing(pixels)
+        self.sounds(pixels)
+        return pixels
+
+    def span(self, pixels, y, x1, x2, color):
+        '''Fill row y from x1 to x2 (inclusive), clipped to the frame.'''
+        x1, x2 = max(0, x1), min(self.width - 1, x2)
+        if 0 <= y < self.height and x1 <= x2:
+            start = (y * self.width + x1) * 3
+            pixels[start:start + (x2 - x1 + 1) * 3] = color * (x2 - x1 + 1)
+
+    def point(self, pixels, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            start = (y * self.width + x) * 3
+            pixels[start:start + 3] = color
+
+    def rectangle(self, pixels, coords, color):
+        x1, y1, x2, y2 = [int(round(c)) for c in coords]
+        for y in range(y1, y2):
+            self.span(pixels, y, x1, x2 - 1, color)
+
+    def ellipse(self, pixels, coords, color, start=0.0, extent=360.0):
+        '''Fill an ellipse, or (if extent is less than 360) a pieslice of one.'''
+        x1, y1, x2, y2 = [int(round(c)) for c in coords]
+        for dy, dx1, dx2 in self.shape_spans(x2 - x1, y2 - y1, int(round(start)) % 360,
+                                            int(round(extent))):
+            self.span(pixels, y1 + dy, x1 + dx1, x1 + dx2, color)
+
+    def shape_spans(self, width, height, start, extent):
+        '''Row spans (dy, dx1, dx2) of a pieslice in a width x height box, relative to
+        its corner; the shapes of things only differ in a few ways, so they are cached.'''
+        key = (width, height, start, extent)
+        spans = self.spans.get(key)
+        if spans is None:
+            spans = self.spans[key] = []
+            cx, cy = width / 2.0, height / 2.0
+            rx, ry = width / 2.0, height / 2.0
+            for dy in range(height + 1):
+                if not rx or not ry or ((dy - cy) / ry) ** 2 > 1.0:
+                    continue
+                half = rx * math.sqrt(1.0 - ((dy - cy) / ry) ** 2)
+                left, right = int(math.ceil(cx - half)), int(cx + half)
+                if extent >= 360:
+                    spans.append((dy, left, right))
+                    continue
+                # Leave out the pixels in the mouth (Tk angles go counterclockwise from 3 o'clock)
+                run = None
+                for dx in range(left, right + 2):
+                    inside = dx <= right and \
+                             (math.degrees(math.atan2(cy - dy, dx - cx)) - start) % 360 <= extent
+                    if inside and run is None:
+                        run = dx
+                    elif not inside and run is not None:
+                        spans.append((dy, run, dx - 1))
+                        run = None
+        return spans
+
+    def line(self, pixels, x1, y1, x2, y2, color):
+        '''Draw a one pixel wide line.'''
+        x1, y1, x2, y2 = [int(round(c)) for c in (x1, y1, x2, y2)]
+        n = max(abs(x2 - x1), abs(y2 - y1), 1)
+        for i in range(n + 1):
+            self.point(pixels, x1 + (x2 - x1) * i // n, y1 + (y2 - y1) * i // n, color)
+
+    def circle(self, pixels, cx, cy, radius, color):
+        '''Draw the outline of a circle.'''
+        cx, cy, radius = int(round(cx)), int(round(cy)), int(round(radius))
+        ring = self.rings.get(radius)
+        if ring is None:
+            n = max(8, int(2 * math.pi * radius))
+            ring = self.rings[radius] = sorted(set([(int(round(radius * math.cos(2 * math.pi * i / n))),
+                                                     int(round(radius * math.sin(2 * math.pi * i / n)))) \
+                                                    for i in range(n)]))
+        for dx, dy in ring:
+            self.point(pixels, cx + dx, cy + dy, color)
+
+    def hearing(self, pixels):
+        '''Show how far each critter that hears can hear.'''
+        color = rgb(Renderer.hearing_color)
+        for thing in self.world.agents:
+            if isinstance(thing, Critter) and isinstance(thing.sensor, Hear):
+                self.circle(pixels, thing.coords[0], thing.coords[1], Hear.hearing_radius, color)
+
+    def sounds(self, pixels):
+        '''Show the sounds: rings that grow as they age, or the loud cells of a SoundField.'''
+        color = rgb(Renderer.sound_color)
+        field = self.world.sound_field
+        if field:
+            for (column, row), loudness in field.cells.items():
+                if loudness >= field.floor * 10:
+                    x, y = column * field.cell, row * field.cell
+                    self.circle(pixels, x + field.cell / 2.0, y + field.cell / 2.0,
+                                min(loudness, 1.0) * field.cell / 2.0, color)
+        else:
+            for coords, age in self.world.sounds:
+                self.circle(pixels, coords[0], coords[1], Thing.radius * (age + 1), color)
+
+    ## Writing
+
+    def stream_path(self):
+        return os.path.join(self.directory, 'frames.rgb')
+
+    def write(self, pixels):
+        '''Write a frame as the next PNG file, or add it to the raw stream.'''
+        if self.raw:
+            with open(self.stream_path(), 'ab') as stream:
+                stream.write(pixels)
+        else:
+            path = os.path.join(self.directory, 'frame%06d.png' % self.world.steps)
+            with open(path, 'wb') as frame:
+                frame.write(png(self.width, self.height, pixels))
+        self.frames += 1
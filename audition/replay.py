@@ -0,0 +1,71 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### Memory of past experiences, so that critters can learn from each one more
+### than once.
+
+import random
+from array import array
+
+class ReplayBuffer:
+    '''The most recent experiences of the critters of one class, in a ring buffer.
+
+    An experience is (state, action, reinforcement, next state) together with the
+    critter that had it.  The buffer is allocated all at once as compact arrays;
+    once it is full, each new experience takes the place of the oldest one.'''
+
+    seed = 0
+    """Seed for sampling (which doesn't use the world's random numbers)."""
+
+    def __init__(self, capacity):
+        """An empty buffer with room for capacity experiences."""
+        self.capacity = capacity
+        self.states = array('q', [0]) * capacity
+        self.actions = array('i', [0]) * capacity
+        self.reinforcements = array('d', [0.0]) * capacity
+        self.next_states = array('q', [0]) * capacity
+        # Critter and its id when the experience was added (ids change when things are recycled)
+        self.owners = [None] * capacity
+        self.owner_ids = array('q', [0]) * capacity
+        # Where the next experience goes, and how many there are
+        self.next = 0
+        self.size = 0
+        self.generator = random.Random(ReplayBuffer.seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, critter, state, action, reinforcement, next_state):
+        '''Remember an experience of critter's.'''
+        i = self.next
+        self.states[i] = state
+        self.actions[i] = action
+        self.reinforcements[i] = reinforcement
+        self.next_states[i] = next_state
+        self.owners[i] = critter
+        self.owner_ids[i] = critter.id
+        self.next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def replay(self, n):
+        '''Have the owners of n experiences chosen at random learn from them again.
+
+        Experiences of critters that have died since are skipped.  Returns the
+        number of experiences replayed.'''
+        replayed = 0
+        for i in [self.generator.randrange(self.size) for j in range(min(n, self.size))]:
+            critter = self.owners[i]
+            if not critter.alive or critter.id != self.owner_ids[i]:
+                continue
+            critter.update_Q(self.states[i], self.actions[i], self.reinforcements[i],
+                             self.next_states[i])
+            replayed += 1
+        return replayed
+
+    def clear(self):
+        '''Forget all of the experiences.'''
+        self.owners = [None] * self.capacity
+        self.next = 0
+        self.size = 0
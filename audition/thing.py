@@ -6,11 +6,15 @@
 ### The things that populate our world.
 
 import random, math
-import utils
+from . import utils
+from .qtables import SparseQ
+from .learners import ValueFunction
 
 class Thing:
     '''Things of all types.'''
 
+    __slots__ = ('coords', 'world', 'id', 'alive', 'graphic_id', 'bind_id')
+
     radius = 10
     """Radius of the Canvas object representing the thing."""
     n = 0
@@ -19,17 +23,27 @@ class Thing:
     color = 'red'
     """Color of the thing's Canvas object."""
 
+    passive = True
+    """Whether the thing's step does nothing, so the world doesn't need to call it."""
+
+    food = None
+    """Type of thing eaten (None for things that don't eat)."""
+
+    texture = 'empty'
+    """What feelers feel when they touch the thing."""
+
+    solid = True
+    """Whether the thing takes up space."""
+
     def __init__(self, world, coords):
-        """Initialize location, food type, texture, solidity, id."""
+        """Initialize location and id."""
         self.coords = coords
         self.world = world
-        self.food = Thing
         self.id = Thing.n
-        self.texture = 'empty'
-        self.solid = True
         self.alive = False
         self.create_graphic()
-        self.world.tag_bind(self.graphic_id, '<1>', self.describe)
+        # Kept to unbind the handler when the graphic goes, or Tk keeps it (and the thing)
+        self.bind_id = self.world.tag_bind(self.graphic_id, '<1>', self.describe)
         Thing.n += 1
 
     def __str__(self):
@@ -47,50 +61,91 @@ class Thing:
         '''Print out useful information about the Thing.'''
         print(self, '-- coordinates:', self.coords)
 
+    def footprint(self, seen):
+        '''Bytes taken up by the thing and what it alone refers to (not in seen, a set of ids).'''
+        return utils.deep_size(self, seen) + utils.deep_size(self.coords, seen)
+
     def step(self):
         """Take primitive actions, if any, and update the thing."""
         pass
 
     def kill(self):
         """Remove the diskoid from the world."""
+        self.world.tag_unbind(self.graphic_id, '<1>', self.bind_id)
         self.world.delete(self.graphic_id)
         del self.world.graphic_objs[self.graphic_id]
+        self.world.mark_changed(self.coords)
+
+    ## Recycling
+
+    def retire(self):
+        """Take the thing out of the world but keep its graphic (hidden) for reuse."""
+        self.world.itemconfigure(self.graphic_id, state='hidden')
+        del self.world.graphic_objs[self.graphic_id]
+        self.world.mark_changed(self.coords)
+
+    def reset(self, coords):
+        """Bring a retired thing back as a new thing at coords."""
+        self.coords = coords
+        self.id = Thing.n
+        x, y = coords
+        self.world.coords(self.graphic_id, x - Thing.radius, y - Thing.radius,
+                          x + Thing.radius, y + Thing.radius)
+        # On top, like a newly created graphic
+        self.world.tag_raise(self.graphic_id)
+        self.world.itemconfigure(self.graphic_id, state='normal')
+        Thing.n += 1
 
 class Clod(Thing):
     """A mineral."""
 
+    __slots__ = ()
+
     color = 'brown'
 
-    def __init__(self, world, coords):
-        """Just for the texture."""
-        Thing.__init__(self, world, coords)
-        self.texture = 'hard'
+    texture = 'hard'
 
 class Fog(Thing):
     """Weather."""
 
+    __slots__ = ()
+
     color = 'yellow'
 
-    def __init__(self, world, coords):
-        Thing.__init__(self, world, coords)
-        self.solid = False
+    solid = False
 
 class Org(Thing):
     """A living thing."""
 
+    __slots__ = ('strength', 'birth')
+
     init_strength = 5000
 
     def __init__(self, world, coords):
         Thing.__init__(self, world, coords)
         self.strength = Org.init_strength
         self.alive = True
-        # Number of time steps the org has been living
-        self.age = 0
+        # Step at which the org was born; see age
+        self.birth = world.steps
+
+    @property
+    def age(self):
+        """Number of time steps the org has been living."""
+        return self.world.steps - self.birth
+
+    @age.setter
+    def age(self, age):
+        self.birth = self.world.steps - age
 
     def step(self):
-        # Age by one
+        # Age is worked out from the world's steps, so there is nothing to update
         Thing.step(self)
-        self.age += 1
+
+    def reset(self, coords):
+        Thing.reset(self, coords)
+        self.strength = Org.init_strength
+        self.alive = True
+        self.birth = self.world.steps
 
     def die(self):
         """The org is scheduled to be lost from the world."""
@@ -104,15 +159,18 @@ class Org(Thing):
 class Plasmoid(Org):
     """A plant-like thing."""
 
+    __slots__ = ()
+
     color = 'green'
 
-    def __init__(self, world, coords):
-        Org.__init__(self, world, coords)
-        self.texture = 'soft'
+    texture = 'soft'
 
 class Critter(Org):
     """An animate thing; it can move, turn, take actions, and learn."""
 
+    __slots__ = ('heading', 'sensor', 'Q', 'policy', 'state', 'chosen_action',
+                 'last_state', 'last_action', 'last_reinforcement')
+
     eta = 0.0
     """Learning rate for Q learning."""
 
@@ -155,13 +213,29 @@ class Critter(Org):
     mouth_angle = 20
     """Opening of the Critter's mouth."""
 
+    passive = False
+
+    sparse_Q = False
+    """Whether to use a SparseQ table, which only has rows for visited states."""
+
+    sparse_Q_limit = None
+    """Most rows a SparseQ table keeps (None for no limit)."""
+
+    value_function = None
+    """'linear' or 'mlp' to share a ValueFunction of the sensor's features among
+    the critters of a class, instead of each having its own Q table."""
+
+    policy_cache = True
+    """Whether to keep each state's best action and choice probabilities until its
+    Q values change, rather than working them out on every step."""
+
     def __init__(self, world, coords, heading=None):
         """Initialize strength and heading in addition to location."""
         self.heading = (heading if heading else random.randint(0, 360))
         Org.__init__(self, world, coords)
-        self.move_dist = Critter.move_dist
-        self.set_actions()
         self.set_sensor()
+        # State -> (luce_cdf, best action, best Q value); see get_policy
+        self.policy = {}
         self.init_Q()
 
     def create_graphic(self):
@@ -174,17 +248,40 @@ class Critter(Org):
                                                 extent=360 - self.mouth_angle,
                                                 fill=self.color, outline='white')
 
-    def set_actions(self):
-        """Set the critter's list of actions."""
-        self.actions = [self.move, self.turn_right, self.turn_left, self.eat]
-        
     def set_sensor(self):
         """Set the critter's sensor."""
-        self.sensor = Sensor(self, world, [])
+        self.sensor = Sensor(self, self.world, [])
+
+    def reset(self, coords, heading=None):
+        """Bring a retired critter back with a new heading, its sensor and a cleared Q table."""
+        self.heading = (heading if heading else random.randint(0, 360))
+        Org.reset(self, coords)
+        self.world.itemconfigure(self.graphic_id, start=self.heading + self.mouth_angle / 2)
+        self.sensor.reset()
+        self.clear_Q()
 
     def init_Q(self):
         """Make the table of Q values, using self.sensor.n_states and len(self.actions)."""
-        self.Q = [[0.0 for a in range(len(self.actions))] for s in range(self.sensor.n_states)]
+        if self.value_function:
+            self.Q = self.world.get_value_function(self)
+        elif self.sparse_Q:
+            self.Q = SparseQ(len(self.actions), limit=self.sparse_Q_limit)
+        else:
+            self.Q = [[0.0 for a in range(len(self.actions))] for s in range(self.sensor.n_states)]
+
+    def clear_Q(self):
+        """Set all Q values back to 0, reusing the table."""
+        self.policy.clear()
+        if isinstance(self.Q, ValueFunction):
+            # Shared with other critters; just make sure it's the world's current one
+            self.init_Q()
+            return
+        if isinstance(self.Q, SparseQ):
+            self.Q.clear()
+            return
+        for row in self.Q:
+            for action in range(len(row)):
+                row[action] = 0.0
 
     def print_Q(self):
         """Pretty print Q values."""
@@ -194,13 +291,25 @@ class Critter(Org):
         for action in self.actions:
             print('%12s' % action.__name__, end=' ')
         print()
-        # State names and values for each row
-        for state in range(self.sensor.n_states):
+        # State names and values for each row (only visited states for a SparseQ)
+        if isinstance(self.Q, SparseQ):
+            states = self.Q.states()
+        else:
+            states = range(self.sensor.n_states)
+        for state in states:
             print('|'.join(self.sensor.int2symbolic(state)).ljust(20), end=' ')
             for action in range(len(self.actions)):
                 print('%+12.3f' % self.Q[state][action], end=' ')
             print()
 
+    def footprint(self, seen):
+        '''Bytes taken up by the critter, its sensor, policy and Q table (unless shared).'''
+        total = Org.footprint(self, seen) + self.sensor.footprint(seen) + \
+                utils.deep_size(self.policy, seen)
+        if not isinstance(self.Q, ValueFunction):
+            total += utils.deep_size(self.Q, seen)
+        return total
+
     def change_strength(self, amount):
         """Change the critter's strength by the amount (pos or neg)."""
         self.strength += amount
@@ -230,15 +339,25 @@ class Critter(Org):
     
     def step(self):
         """Select an action, execute it, and receive the reinforcement."""
+        self.prepare()
+        self.act()
+
+    def prepare(self):
+        '''Age, sense and decide what to do, without changing the world.'''
         # Age
         Org.step(self)
         # Sense and save state
-        state = self.sensor.sense()
+        self.state = self.sensor.sense()
         # Decide what to do
-        action_index = self.decide(state)
+        self.chosen_action = self.decide(self.state)
+
+    def act(self):
+        '''Execute the action chosen in prepare, then learn from the reinforcement.'''
+        state = self.state
+        action_index = self.chosen_action
         action = self.actions[action_index]
         # Act, getting the new reinforcement
-        reinforcement = action()
+        reinforcement = action(self)
         # Update reinforcement with the cost of living
         reinforcement += Critter.step_cost
         # Learn about the last state and action, using state as "next state"
@@ -257,6 +376,9 @@ class Critter(Org):
 
     def decide(self, state):
         '''Get an action index using the exponential Luce choice rule.'''
+        policy = self.get_policy(state)
+        if policy:
+            return utils.cdf_choice(policy[0], len(self.actions))
         return utils.exp_luce_choice(self.Q[state], self.exploitation)
         # Comment out the above and uncomment below to use the simpler binary
         # exploration-exploitation rule, which does not take the Q values into account
@@ -271,25 +393,71 @@ class Critter(Org):
 
     def learn(self, current_state):
         '''Update the Q values for the last state-last action pair.'''
+        self.update_Q(self.last_state, self.last_action, self.last_reinforcement, current_state)
+        self.world.remember(self, self.last_state, self.last_action, self.last_reinforcement,
+                            current_state)
+
+    def update_Q(self, state, action, reinforcement, next_state):
+        '''Update the Q value for state and action, given what followed.'''
+        events = self.world.events
+        if isinstance(self.Q, ValueFunction):
+            # The shared value function learns from everyone at the end of the step
+            target = reinforcement + self.gamma * self.get_best_Q(next_state)
+            self.Q.update(state, action, target)
+            events[type(self), 'update'] += 1
+            events[type(self), 'q_change'] += self.eta * abs(target - self.Q[state][action])
+            return
+        if not self.eta:
+            # The new value would just be the current one
+            return
         # Current Q value from the table
-        current_Q = self.Q[self.last_state][self.last_action]
+        current_Q = self.Q[state][action]
         # Make the new value be the sum of a proportion of the current value
         # and a proportion of the new information
-        # (last reinforcement + estimate of best value of current state)
-        self.Q[self.last_state][self.last_action] = \
+        # (reinforcement + estimate of best value of next state)
+        new_Q = self.Q[state][action] = \
             (1.0 - self.eta) * current_Q + \
-            self.eta * (self.last_reinforcement + \
-                        self.gamma * self.get_best_Q(current_state))
+            self.eta * (reinforcement + \
+                        self.gamma * self.get_best_Q(next_state))
+        # The state's cached policy isn't right any more
+        self.policy.pop(state, None)
+        events[type(self), 'update'] += 1
+        events[type(self), 'q_change'] += abs(new_Q - current_Q)
+
+    def get_policy(self, state):
+        '''(luce_cdf, best action, best Q value) for the state, or None if not cached.
+
+        Only Q tables whose rows change just through update_Q can be cached: not
+        shared value functions, and not SparseQ tables that drop rows.'''
+        policy = self.policy.get(state)
+        if policy is None:
+            if not self.policy_cache or isinstance(self.Q, ValueFunction) or \
+               (isinstance(self.Q, SparseQ) and self.Q.limit):
+                return None
+            row = self.Q[state]
+            policy = self.policy[state] = (utils.luce_cdf(row, self.exploitation),
+                                           self.find_best_action(row), max(row))
+        return policy
 
     def get_best_Q(self, state):
         '''The highest Q value for a state.'''
+        policy = self.get_policy(state)
+        if policy:
+            return policy[2]
         return max(self.Q[state])
 
     def get_best_action(self, state):
         '''The action index with the highest Q value for a state.'''
+        policy = self.get_policy(state)
+        if policy:
+            return policy[1]
+        return self.find_best_action(self.Q[state])
+
+    def find_best_action(self, row):
+        '''The action index with the highest Q value in a row of the Q table.'''
         highest = -1000
         index = 0
-        for i, q in enumerate(self.Q[state]):
+        for i, q in enumerate(row):
             if q > highest:
                 highest = q
                 index = i
@@ -304,19 +472,17 @@ class Critter(Org):
         x, y = self.world.adjust_coords((self.coords[0] + x_dist,
                                          self.coords[1] + y_dist))
         # Check to see whether critter is bumping into a clod
-        x1 = max(0, x - Thing.radius + Critter.bump_offset)
-        y1 = max(0, y - Thing.radius + Critter.bump_offset)
-        x2 = min(self.world.width, x + Thing.radius - Critter.bump_offset)
-        y2 = min(self.world.height, y + Thing.radius - Critter.bump_offset)
-        overlapping = self.world.get_overlapping((x1, y1, x2, y2), self.graphic_id)
-        if [o for o in overlapping if isinstance(o, Clod)]:
+        if self.world.bumps_into_clod(x, y):
             # Fail to move and get punished for the collision with the thing
+            self.world.events[type(self), 'bump'] += 1
             return Critter.hard_bump_cost
         # Go ahead and move
         self.world.coords(self.graphic_id,
                           x - Thing.radius, y - Thing.radius,
                           x + Thing.radius, y + Thing.radius)
+        self.world.mark_changed(self.coords)
         self.coords = x, y
+        self.world.mark_changed(self.coords)
         self.sensor.move()
         return Critter.move_cost
 
@@ -328,6 +494,8 @@ class Critter(Org):
             self.heading = (self.heading + angle) % 360
         self.world.itemconfigure(self.graphic_id,
                                  start = self.heading + self.mouth_angle / 2)
+        # The mouth is part of the critter's shape for overlap queries
+        self.world.mark_changed(self.coords)
         self.sensor.turn()
         return Critter.turn_cost
 
@@ -345,44 +513,59 @@ class Critter(Org):
         '''Attempt to eat.'''
         cost = Critter.eat_cost
         for c in self.get_edible():
-            if isinstance(c, self.food):
+            # When everyone acts at once, only the first critter to act gets the food
+            if isinstance(c, self.food) and (c.alive or not self.world.synchronous):
                 cost += Critter.food_reward
+                self.world.events[type(self), 'eat'] += 1
                 c.die()
                 #when the diskoid eats a sound is made and added to the world
                 self.world.add_sound(self.coords, age=0)
+        # Plants may be biomass in a field rather than things
+        if self.world.plants and self.food is Plasmoid:
+            end_x, end_y = self.mouth_end()
+            if self.world.plants.eat(end_x, end_y):
+                cost += Critter.food_reward
+                self.world.events[type(self), 'eat'] += 1
+                self.world.add_sound(self.coords, age=0)
         return cost
 
+    actions = (move, turn_right, turn_left, eat)
+    """The actions that can be selected, indexed by the columns of the Q table; the same
+    for all critters of a class, so each is called with the critter."""
+
     ## Dying
     def kill(self):
         """Remove the critter and its sensor from the world."""
         Org.kill(self)
         self.sensor.destroy()
 
+    def retire(self):
+        """Take the critter out of the world, hiding its sensor for reuse."""
+        Org.retire(self)
+        self.sensor.hide()
+
 class Diskoid(Critter):
     '''Critters that adapt.'''
 
+    __slots__ = ()
+
     mouth_angle = 30
     """Angle of the diskoid's mouth."""
     color = 'magenta'
     """Color of diskoid."""
+    feeler_specs = [(0, 13), (90, 13), (2, 20), (270, 13)]
+    """Angle and length of each feeler: 3 short feelers around mouth, one long one out of mouth."""
+    textures = ['hard', 'soft']
+    """Textures the feelers can sense."""
 
-    def __init__(self, world, coords):
-        """Set the coordinates, world, and heading, and create the Canvas object."""
-        Critter.__init__(self, world, coords)
-        self.food = Plasmoid
-        self.hunger = 0
+    food = Plasmoid
+
+    actions = (Critter.move, Critter.turn_left, Critter.turn_right, Critter.eat)
 
     def set_sensor(self):
         '''Feel sensor.'''
-        self.sensor = Feel(self, self.world,
-                           # 3 short feelers around mouth, one long one out of mouth
-                           [(0, 13), (90, 13), (2, 20), (270, 13)],
-                           ['hard', 'soft'])
-
-    def set_actions(self):
-        """Set the critter's list of actions."""
-        self.actions = [self.move, self.turn_left, self.turn_right, self.eat]
-        
+        self.sensor = Feel(self, self.world, self.feeler_specs, self.textures)
+
     def make_graphical_object(self):
         """Create the Canvas object for the diskoid: an arc."""
         x, y = self.coords
@@ -397,13 +580,15 @@ class Pentoid(Critter):
     """critters that can hear"""
     #written by both Zach and Aaron
 
+    __slots__ = ()
+
     mouth_angle = 35
     color = "blue"
-    
-    def __init__(self, world, coords):
-        Critter.__init__(self, world, coords)
-        self.food = Diskoid
-        self.hunger = 0
+
+    food = Diskoid
+
+    # Has actions which are reinforced by q learning
+    actions = (Critter.move, Critter.turn_left, Critter.turn_right, Critter.eat)
 
     def set_sensor(self):
         """hear sensor"""
@@ -411,10 +596,6 @@ class Pentoid(Critter):
                                               ("medium", "front"), ("medium", "back"), ("medium", "left"), ("medium", "right"),
                                               ("far", "front"), ("far", "back"), ("far", "left"), ("far", "right")]) 
 
-    def set_actions(self):
-        """has actions which the are reinforced by q learning"""
-        self.actions = [self.move, self.turn_left, self.turn_right, self.eat]
-
     def make_graphical_object(self):
         """creates canvas object pentoid"""
         x, y = self.coords
@@ -427,12 +608,18 @@ class Pentoid(Critter):
 
 class Sensor(object):
 
+    __slots__ = ('critter', 'world', 'features', 'n_features', 'observation', 'chance')
+
     def __init__(self, critter, world, features):
         """Give the sensor a pointer to its critter."""
         self.critter = critter
         self.world = world
         self.features = features
         self.n_features = len(features)
+        # (pose, world version, regions, state) of the last observation that can be reused
+        self.observation = None
+        # Whether the last observation depended on random choices
+        self.chance = False
 
     def get_n_states(self):
         """Number of different states."""
@@ -442,16 +629,43 @@ class Sensor(object):
         """Number of different state features."""
         return self.n_features
 
+    def state_features(self, state):
+        """The integer state as a list of get_n_state_features() numbers (one-hot)."""
+        features = [0.0] * self.get_n_state_features()
+        if state < len(features):
+            features[state] = 1.0
+        return features
+
     def sense(self, symbolic=False):
         """Get sensory information to be passed on to critter.
         If symbolic is True, return a list of strings.
         Otherwise return a single integer.
         """
-        features = self.sense_symbolic()
         if symbolic:
-            return features
+            return self.sense_symbolic()
+        world = self.world
+        if not world.reuse_observations:
+            return self.symbolic2int(self.sense_symbolic())
+        pose = (self.critter.coords, self.critter.heading)
+        observation = self.observation
+        if observation and observation[0] == pose and \
+           max([world.region_version(region) for region in observation[2]]) <= observation[1]:
+            world.events[type(self.critter), 'reuse'] += 1
+            return observation[3]
+        version = world.version
+        self.chance = False
+        state = self.symbolic2int(self.sense_symbolic())
+        regions = self.sense_regions()
+        if regions and not self.chance:
+            self.observation = (pose, version, regions, state)
         else:
-            return self.symbolic2int(features)
+            self.observation = None
+        return state
+
+    def sense_regions(self):
+        '''The regions x1, y1, x2, y2 that the last observation depends on, besides
+        the critter's pose, or None if it can't be reused.'''
+        return None
 
     def sense_symbolic(self):
         '''A list of features of things sensed.'''
@@ -482,9 +696,23 @@ class Sensor(object):
         '''Get rid of the graphical object(s).'''
         pass
 
+    def hide(self):
+        '''Hide the graphical object(s) while the critter is retired.'''
+        pass
+
+    def reset(self):
+        '''Show the graphical object(s) again for a recycled critter.'''
+        self.observation = None
+
+    def footprint(self, seen):
+        '''Bytes taken up by the sensor and what it alone refers to (not in seen).'''
+        return utils.deep_size(self, seen) + utils.deep_size(self.features, seen)
+
 class Feel(Sensor):
     '''One or more feelers that can sense textures at their ends.'''
 
+    __slots__ = ('feeler_specs', 'feelers', 'n_states', 'regions')
+
     color = 'yellow'
 
     def __init__(self, critter, world, feeler_specs, textures):
@@ -494,6 +722,8 @@ class Feel(Sensor):
         self.feeler_specs = feeler_specs
         self.create_feelers()
         self.n_states = (self.n_features + 1) ** len(self.feelers)
+        # What the last call to sense_symbolic looked at
+        self.regions = None
 
     def get_n_states(self):
         """Number of different states."""
@@ -503,6 +733,15 @@ class Feel(Sensor):
         """Number of different state features."""
         return (self.n_features + 1) * len(self.feelers)
 
+    def state_features(self, state):
+        """One-hot texture (including 'none') for each feeler, as in symbolic2int."""
+        n = self.n_features + 1
+        features = [0.0] * (n * len(self.feelers))
+        for index in range(len(self.feelers)):
+            features[index * n + state % n] = 1.0
+            state //= n
+        return features
+
     def feeler_coords(self, angle, length):
         '''Coordinates of feeler with given angle and length.'''
         end_x, end_y = utils.get_endpoint(self.critter.coords[0], self.critter.coords[1],
@@ -527,15 +766,25 @@ class Feel(Sensor):
     def sense_symbolic(self):
         '''List of Org textures felt by feelers, including texture positions.'''
         found = []
+        regions = self.regions = []
         for index, feeler in enumerate(self.feelers):
             # For each feeler, get the things that its end overlaps with
             end_x, end_y = list(self.world.coords(feeler))[2:]
+            # Rounded as in get_overlapping, so it's the region the result depends on
+            region = tuple([int(round(c)) for c in (end_x-1, end_y-1, end_x+1, end_y+1)])
+            regions.append(region)
             features = [t.texture \
-                       for t in self.world.get_overlapping((end_x-1, end_y-1, end_x+1, end_y+1), None) \
+                       for t in self.world.get_overlapping(region, None) \
                        if t.texture in self.features]
+            if self.world.plants:
+                regions.append(self.world.plants.cell_region(self.world.plants.cell_index(end_x, end_y)))
+                texture = self.world.plants.feels(end_x, end_y)
+                if texture in self.features:
+                    features.append(texture)
             if features:
                 if len(features) > 1:
                     # Pick just one feature per feeler
+                    self.chance = True
                     found.append(random.choice(features))
                 else:
                     found.append(features[0])
@@ -543,6 +792,10 @@ class Feel(Sensor):
                 found.append('none')
         return found
 
+    def sense_regions(self):
+        '''The little squares around the ends of the feelers, and the plant cells under them.'''
+        return self.regions
+
     def symbolic2int(self, symbols):
         '''Convert list of textures to an integer state representation.'''
         total = 0
@@ -584,15 +837,41 @@ class Feel(Sensor):
         for f in self.feelers:
             self.world.delete(f)
 
+    def hide(self):
+        '''Hide the feelers while the critter is retired.'''
+        for f in self.feelers:
+            self.world.itemconfigure(f, state='hidden')
+
+    def reset(self):
+        '''Put the feelers of a recycled critter in place and show them.'''
+        Sensor.reset(self)
+        self.move()
+        for f in self.feelers:
+            self.world.itemconfigure(f, state='normal')
+            self.world.tag_lower(f, self.critter.graphic_id)
+
+    def footprint(self, seen):
+        return Sensor.footprint(self, seen) + utils.deep_size(self.feelers, seen)
+
 class Hear(Sensor):
     """allows pentoids to hear sounds made in the world"""
     #written by both zach and aaron
 
+    __slots__ = ('n_states',)
+
     color = "orange"
 
+    hearing_radius = 50
+    """Distance within which sounds can be heard."""
+
+    near = 0.5
+    """Loudness in the world's SoundField from which a sound counts as near."""
+
+    medium = 0.15
+    """Loudness in the world's SoundField from which a sound counts as medium (below, far)."""
+
     def __init__(self, critter, world, orientations):
         Sensor.__init__(self, critter, world, orientations)
-        self.hearing_radius = 50
         ##self.hearing_specs = hearing_specs
         self.n_states = (self.n_features + 1) **1
         #print("state count")
@@ -637,6 +916,8 @@ class Hear(Sensor):
 
     def sense_symbolic(self):
         '''List of Org textures heard by ear, including angle and dist.'''
+        if self.world.sound_field:
+            return self.sense_field()
         final_sensed = []
         closest = []
         distantces = []
@@ -709,11 +990,42 @@ class Hear(Sensor):
 ##        if right[1] >= closest[1] >= right[1]:
 ##            final_sensed.append("right")
                 
+    def sense_regions(self):
+        '''The square around the critter within which sounds are heard; the loudness
+        in a SoundField changes every step, so then nothing is reused.'''
+        if self.world.sound_field:
+            return None
+        x, y = self.critter.coords
+        radius = self.hearing_radius
+        return [(x - radius, y - radius, x + radius, y + radius)]
+
+    def sense_field(self):
+        '''Loudness and direction (relative to the heading) of the world's SoundField.'''
+        loudness, angle = self.world.sound_field.listen(*self.critter.coords)
+        if loudness < self.world.sound_field.floor:
+            return ("none", "none")
+        if loudness >= Hear.near:
+            distance = "near"
+        elif loudness >= Hear.medium:
+            distance = "medium"
+        else:
+            distance = "far"
+        # No direction means the sound is all around, so right in front of the mouth
+        relative = 0 if angle is None else (angle - self.critter.heading) % 360
+        if relative < 45 or relative >= 315:
+            direction = "front"
+        elif relative < 135:
+            direction = "left"
+        elif relative < 225:
+            direction = "back"
+        else:
+            direction = "right"
+        return (distance, direction)
+
     def symbolic2int(self, symbols):
         '''Convert list of sound to an integer state representation.'''
         total = 0
         power = 0
-        orientations = self.features.append(('none', "none"))
         #print(symbols)
         #index method doesnt accept tuples so we had to hard code thier indexs in the list
         if symbols == ("none", "none"):
@@ -749,7 +1061,8 @@ class Hear(Sensor):
     def int2symbolic(self, state):
         '''Convert an integer state representation to a list of sound.'''
         remainder = state
-        orientations =  self.features.append(('none', "none"))
+        # In the order of the totals in symbolic2int
+        orientations = self.features + [("none", "none")]
         symbols = orientations[state]
 ##        for power in reversed(range(1)):
 ##            n = len(orientations)**power
@@ -0,0 +1,382 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### A large toroidal world split into rectangular tiles, each owned and stepped by
+### its own worker process.  After every step each tile sends copies ("ghosts") of
+### the things near its edges to its neighbours, so that their critters can feel,
+### hear and eat them on the next step.  Critters that move out of a tile migrate
+### to the tile that now owns them, taking their Q tables with them.  With a
+### SoundField, each tile sends the loudness of the cells it owns near its edges
+### in the same way, and takes the cells it doesn't own from their owners.
+###
+###   world = TiledWorld(width=1800, height=1800, columns=4, rows=4)
+###   world.run(500)
+###   world.close()
+
+import random, multiprocessing
+from collections import Counter
+from .arena import Arena
+from .thing import *
+from .world import World, print_stats
+from .fields import SoundField
+from .learners import ValueFunction
+from .cache import current_settings, apply_settings
+
+ID_BLOCK = 10 ** 9
+"""Things created by tile i get ids from (i + 1) * ID_BLOCK on, so ids are unique."""
+
+def tile_index(coords, width, height, columns, rows):
+    '''Index of the tile that owns position coords.'''
+    column = max(0, min(int(coords[0] * columns // width), columns - 1))
+    row = max(0, min(int(coords[1] * rows // height), rows - 1))
+    return row * columns + column
+
+def tile_bounds(index, width, height, columns, rows):
+    '''Corners x1, y1, x2, y2 of the tile with the given index.'''
+    column, row = index % columns, index // columns
+    return (column * width / columns, row * height / rows,
+            (column + 1) * width / columns, (row + 1) * height / rows)
+
+def ghost_width():
+    '''How far beyond its edges a tile needs to know about other tiles' things.
+
+    Enough for the longest feeler, hearing, moving and eating, plus the size
+    of the thing that is felt or eaten.'''
+    feeler = max([length for angle, length in Diskoid.feeler_specs])
+    reach = max(feeler + 1, Hear.hearing_radius, Critter.move_dist,
+                Thing.radius + Critter.eat_range)
+    return reach + Thing.radius + 2
+
+def export_thing(thing, ghost=False):
+    '''What another process needs to recreate thing (only its looks for a ghost).'''
+    state = {'type': type(thing), 'id': thing.id, 'coords': thing.coords}
+    if isinstance(thing, Critter):
+        state['heading'] = thing.heading
+    if isinstance(thing, Org) and not ghost:
+        state['strength'] = thing.strength
+        state['age'] = thing.age
+        if isinstance(thing, Critter):
+            # A shared value function belongs to the tile; the critter joins the next tile's
+            if not isinstance(thing.Q, ValueFunction):
+                state['Q'] = thing.Q
+            for name in ('last_state', 'last_action', 'last_reinforcement'):
+                if hasattr(thing, name):
+                    state[name] = getattr(thing, name)
+    return state
+
+class TileWorld(Arena, World):
+    '''The part of a tiled world that one worker owns, without a display.
+
+    The world keeps the coordinates of the whole torus; it just only steps the
+    things in its own tile.  Ghosts are in graphic_objs, so critters can sense
+    them, but not in things, so they are never stepped or counted.'''
+
+    def __init__(self, width, height, columns=1, rows=1, index=0):
+        """Set up the tile with the given index and an empty world."""
+        Arena.__init__(self)
+        self.frame = None
+        self.columns = columns
+        self.rows = rows
+        self.index = index
+        self.bounds = tile_bounds(index, width, height, columns, rows)
+        # Id -> ghost
+        self.ghosts = {}
+        # Sounds made in this tile during the current step
+        self.new_sounds = []
+        self.setup(width, height)
+
+    def init_things(self):
+        """Things are handed to the tile by the TiledWorld."""
+        pass
+
+    def replenish(self):
+        """The TiledWorld decides where new things appear."""
+        pass
+
+    def owns(self, coords):
+        '''Is position coords in this tile?'''
+        return tile_index(coords, self.width, self.height, self.columns, self.rows) == self.index
+
+    def near_edge(self, coords, distance):
+        '''Is coords within distance of one of the edges of the tile?'''
+        x1, y1, x2, y2 = self.bounds
+        x, y = coords
+        return x - x1 < distance or x2 - x < distance or y - y1 < distance or y2 - y < distance
+
+    def add_sound(self, sound_coord, age=0):
+        World.add_sound(self, sound_coord, age)
+        if not self.sound_field:
+            self.new_sounds.append(self.sounds[-1])
+
+    def cell_center(self, cell):
+        '''Coordinates of the center of a (column, row) cell of the SoundField.'''
+        return (cell[0] + 0.5) * SoundField.cell, (cell[1] + 0.5) * SoundField.cell
+
+    def edge_cells(self, distance):
+        '''(center, cell, loudness) for the audible cells of the SoundField that the
+        tile owns within distance of its edges.'''
+        found = []
+        for cell, loudness in self.sound_field.cells.items():
+            center = self.cell_center(cell)
+            if self.owns(center) and self.near_edge(center, distance):
+                found.append((center, cell, loudness))
+        return found
+
+    def update_field(self, cells):
+        '''Replace the cells of the SoundField owned by other tiles with theirs.'''
+        field = self.sound_field
+        for cell in list(field.cells):
+            if not self.owns(self.cell_center(cell)):
+                del field.cells[cell]
+        for cell, loudness in cells:
+            field.cells[cell] = loudness
+
+    def adopt(self, state, ghost=False):
+        '''Recreate a thing from its exported state, either as a ghost or as our own.'''
+        tp, coords = state['type'], state['coords']
+        if ghost:
+            thing = tp(self, coords)
+            self.graphic_objs[thing.graphic_id] = thing
+            self.mark_changed(coords)
+            self.ghosts[state['id']] = thing
+        else:
+            thing = self.place_thing(tp, coords)
+        thing.id = state['id']
+        if 'heading' in state:
+            thing.heading = state['heading']
+            self.itemconfigure(thing.graphic_id, start=thing.heading + thing.mouth_angle / 2)
+            thing.sensor.turn()
+        for name in ('strength', 'age', 'Q', 'last_state', 'last_action', 'last_reinforcement'):
+            if name in state:
+                setattr(thing, name, state[name])
+        if isinstance(thing, Critter) and not ghost and 'Q' not in state:
+            # Learn into this tile's shared value function
+            thing.init_Q()
+        return thing
+
+    def set_pose(self, thing, coords, heading=None):
+        '''Put a thing that was moved or turned in another process in its new place.'''
+        moved = coords != thing.coords
+        turned = heading is not None and heading != thing.heading
+        if moved:
+            x, y = coords
+            self.coords(thing.graphic_id, x - Thing.radius, y - Thing.radius,
+                        x + Thing.radius, y + Thing.radius)
+            self.mark_changed(thing.coords)
+            thing.coords = coords
+            self.mark_changed(coords)
+        if turned:
+            thing.heading = heading
+            self.itemconfigure(thing.graphic_id, start=heading + thing.mouth_angle / 2)
+            self.mark_changed(coords)
+        if (moved or turned) and isinstance(thing, Critter):
+            thing.sensor.move()
+
+    def update_ghosts(self, states, eaten):
+        '''Make the ghosts match the things near the tile in other tiles.
+
+        Ghosts that are still there are moved rather than recreated.  Things that
+        have just been eaten stay away even if their owner hasn't heard yet.'''
+        current = {}
+        for state in states:
+            if state['id'] not in eaten:
+                current[state['id']] = state
+        for ghost_id, ghost in list(self.ghosts.items()):
+            state = current.get(ghost_id)
+            if state and state['type'] is type(ghost) and (ghost.alive or not isinstance(ghost, Org)):
+                self.set_pose(ghost, state['coords'], state.get('heading'))
+                del current[ghost_id]
+            else:
+                ghost.kill()
+                del self.ghosts[ghost_id]
+        for state in current.values():
+            self.adopt(state, ghost=True)
+
+    def exchange_step(self, inbox):
+        '''Take in what has changed elsewhere, step, and report what others need to know.'''
+        Critter.eta = inbox['eta']
+        eaten = set(inbox['eaten'])
+        self.update_ghosts(inbox['ghosts'], eaten)
+        # Critters moving in and new things
+        for state in inbox['things']:
+            self.adopt(state)
+        for tp, coords in inbox['spawns']:
+            self.place_thing(tp, coords)
+        # Our things that were eaten by critters in other tiles
+        for thing in self.things:
+            if thing.id in eaten and isinstance(thing, Org):
+                thing.die()
+        self.kill_off()
+        # Sounds made near the tile in other tiles
+        for coords, age in inbox['sounds']:
+            World.add_sound(self, coords, age)
+        if self.sound_field:
+            self.update_field(inbox['field'])
+        self.new_sounds = []
+        self.step()
+        # Critters that have left the tile
+        leaving = [thing for thing in self.things \
+                   if isinstance(thing, Critter) and not self.owns(thing.coords)]
+        for thing in leaving:
+            self.remove_thing(thing)
+        distance = ghost_width()
+        return {'eaten': [ghost.id for ghost in self.ghosts.values() \
+                          if isinstance(ghost, Org) and not ghost.alive],
+                'things': [export_thing(thing) for thing in leaving],
+                'edge': [export_thing(thing, ghost=True) for thing in self.things \
+                         if not isinstance(thing, Clod) and self.near_edge(thing.coords, distance)],
+                'sounds': [(coords, age) for coords, age in self.new_sounds if age < 4],
+                'field': self.edge_cells(distance) if self.sound_field else [],
+                'counts': Counter([type(thing) for thing in self.things])}
+
+    def org_stats(self):
+        '''Type, strength and age of each of the tile's orgs.'''
+        return [(type(t), t.strength, t.age) for t in self.things if isinstance(t, Org)]
+
+def run_tile(connection, width, height, columns, rows, index, seed, settings):
+    '''Worker process: own one tile, with the master's class settings, and step it
+    whenever asked to.'''
+    apply_settings(settings)
+    random.seed(seed)
+    Thing.n = (index + 1) * ID_BLOCK
+    world = TileWorld(width, height, columns, rows, index)
+    while True:
+        message = connection.recv()
+        if message[0] == 'step':
+            connection.send(world.exchange_step(message[1]))
+        elif message[0] == 'stats':
+            connection.send(world.org_stats())
+        else:
+            break
+
+class TiledWorld:
+    '''A world of width x height split into columns x rows tiles, one process per tile.
+
+    Things are created from World.thing_specs, as in an ordinary World.  Things
+    in one tile see things and sounds in other tiles as they were at the end of
+    the previous step.  Plants have to be Plasmoid things: a PlantField isn't
+    split over the tiles, so World.plant_field can't be set.'''
+
+    def __init__(self, width=900, height=900, columns=2, rows=2, seed=None):
+        """Place the initial things and start a worker for each tile."""
+        if World.plant_field:
+            raise ValueError('a TiledWorld has no PlantField; turn off World.plant_field '
+                             'to have Plasmoid things instead')
+        self.width = width
+        self.height = height
+        self.columns = columns
+        self.rows = rows
+        self.n_tiles = columns * rows
+        self.ghost = ghost_width()
+        self.steps = 0
+        random.seed(seed)
+        # The whole world, used to place things; once they've been handed out only the clods stay
+        self.layout = TileWorld(width, height)
+        World.init_things(self.layout)
+        self.counts = Counter([type(thing) for thing in self.layout.things])
+        self.inboxes = [self.empty_inbox() for i in range(self.n_tiles)]
+        for thing in list(self.layout.things):
+            if isinstance(thing, Clod):
+                # Every tile gets all of the clods
+                for inbox in self.inboxes:
+                    inbox['things'].append(export_thing(thing))
+            else:
+                self.inboxes[self.owner(thing.coords)]['things'].append(export_thing(thing))
+                self.layout.remove_thing(thing)
+        self.connections = []
+        self.workers = []
+        # Workers that are spawned rather than forked start with the defaults
+        settings = current_settings()
+        for index in range(self.n_tiles):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=run_tile,
+                                             args=(worker_connection, width, height,
+                                                   columns, rows, index,
+                                                   random.randrange(2 ** 32), settings),
+                                             daemon=True)
+            worker.start()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def empty_inbox(self):
+        '''What a tile gets at the start of a step, before anything has been added.'''
+        return {'eta': Critter.eta, 'eaten': [], 'ghosts': [], 'things': [],
+                'spawns': [], 'sounds': [], 'field': []}
+
+    def owner(self, coords):
+        '''Index of the tile that owns coords.'''
+        return tile_index(coords, self.width, self.height, self.columns, self.rows)
+
+    def neighbours(self, coords, index):
+        '''Tiles other than index for which coords is within ghost range.'''
+        x, y = coords
+        found = []
+        for other in range(self.n_tiles):
+            x1, y1, x2, y2 = tile_bounds(other, self.width, self.height, self.columns, self.rows)
+            if other != index and x1 - self.ghost <= x <= x2 + self.ghost \
+               and y1 - self.ghost <= y <= y2 + self.ghost:
+                found.append(other)
+        return found
+
+    def step(self):
+        """Step all of the tiles at once and pass on what crosses tile edges."""
+        # Recreate things if number has fallen below minimum for type
+        for typ, specs in World.thing_specs.items():
+            if 'min' in specs:
+                for thing in range(specs['min'] - self.counts[typ]):
+                    coords = self.layout.get_thing_coords(clusters=specs.get('clusters', []))
+                    self.inboxes[self.owner(coords)]['spawns'].append((typ, coords))
+        for connection, inbox in zip(self.connections, self.inboxes):
+            inbox['eta'] = Critter.eta
+            connection.send(('step', inbox))
+        outboxes = [connection.recv() for connection in self.connections]
+        self.inboxes = [self.empty_inbox() for i in range(self.n_tiles)]
+        self.counts = Counter()
+        for index, outbox in enumerate(outboxes):
+            self.counts.update(outbox['counts'])
+            # Critters on their way to another tile belong to neither until the next step
+            for state in outbox['things']:
+                self.inboxes[self.owner(state['coords'])]['things'].append(state)
+                self.counts[state['type']] += 1
+            for state in outbox['edge']:
+                for other in self.neighbours(state['coords'], index):
+                    self.inboxes[other]['ghosts'].append(state)
+            for sound in outbox['sounds']:
+                for other in self.neighbours(sound[0], index):
+                    self.inboxes[other]['sounds'].append(sound)
+            for center, cell, loudness in outbox['field']:
+                for other in self.neighbours(center, index):
+                    self.inboxes[other]['field'].append((cell, loudness))
+            # The owner of an eaten ghost may not be its owner any more, so tell everyone
+            for inbox in self.inboxes:
+                inbox['eaten'].extend(outbox['eaten'])
+        self.steps += 1
+
+    def run(self, steps=None):
+        """Run step() steps (default World.steps_per_run) times and print statistics."""
+        for s in range(steps or World.steps_per_run):
+            self.step()
+        self.run_stats()
+
+    def run_stats(self):
+        '''Print statistics about the orgs in all of the tiles, and those on their way
+        to one.'''
+        orgs = []
+        for connection in self.connections:
+            connection.send(('stats',))
+        for connection in self.connections:
+            orgs.extend(connection.recv())
+        for inbox in self.inboxes:
+            for state in inbox['things']:
+                if issubclass(state['type'], Org):
+                    orgs.append((state['type'], state['strength'], state['age']))
+        print_stats(self.steps, orgs)
+
+    def close(self):
+        """Stop the workers."""
+        for connection in self.connections:
+            connection.send(('stop',))
+        for worker in self.workers:
+            worker.join()
@@ -4,7 +4,7 @@
 ###
 ### Miscellaneous utility functions
 
-import math, random
+import math, random, bisect, sys
 from functools import reduce
 
 def reduce_lists(lists):
@@ -25,6 +25,26 @@ def normalize(vector):
     for i in range(len(vector)):
         vector[i] /= total
 
+def deep_size(obj, seen):
+    '''Bytes taken up by obj and, for containers, their contents, skipping anything
+    whose id is in seen (a set, which the ids of everything counted are added to).
+
+    Objects with __slots__ are counted without what their slots refer to.'''
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += deep_size(item, seen)
+    elif hasattr(obj, 'rows'):
+        # A SparseQ table
+        size += deep_size(obj.rows, seen)
+    return size
+
 def dot_product(v1, v2):
     '''Dot product of the two vectors.'''
     return sum([x1 * x2 for x1, x2 in zip(v1, v2)])
@@ -130,6 +150,26 @@ def exp_luce_choice(seq, mult = 1.0):
         # All values are 0; pick a random position
         return random.randint(0, len(seq) - 1)
 
+def luce_cdf(seq, mult = 1.0):
+    '''Cumulative probabilities that exp_luce_choice gives the indices of seq, or None
+    if all of the weights are 0.'''
+    exp_seq = [math.exp(x * mult) for x in seq]
+    total = sum(exp_seq)
+    if not total:
+        return None
+    cdf = []
+    scaled_total = 0.0
+    for elem in exp_seq:
+        scaled_total += elem / total
+        cdf.append(scaled_total)
+    return cdf
+
+def cdf_choice(cdf, n):
+    '''Choose one of n indices like exp_luce_choice, given the luce_cdf of the values.'''
+    if cdf is None:
+        return random.randint(0, n - 1)
+    return min(bisect.bisect_right(cdf, random.random()), n - 1)
+
 def bin_to_dec(bin):
     '''Convert a list of booleans to the corresponding decimal number.'''
     sum = 0
@@ -0,0 +1,589 @@
+### Q320: Spring 2012
+### Cognitive Science Program, Indiana University
+### Michael Gasser: gasser@cs.indiana.edu
+###
+### Reinforcement Learning World
+### A toroidal world with diskoids that can move around in it and use reinforcement
+### learning to figure out that they should be avoiding the clods and eating
+### the plasmoids. This version allows things of a certain type to be clustered in
+### particular regions of the world. Portions that are different from main.py
+### are marked with #{ COMMENT code #}.
+###
+### World has everything but the drawing surface, which comes from a Canvas in
+### the GUI (see gui.py) or from an Arena in a HeadlessWorld, so this module can
+### be imported without tkinter.
+
+import random, math, time
+from collections import Counter
+from .arena import Arena
+from .thing import *
+from .fields import PlantField, SoundField
+from .learners import value_functions
+from .replay import ReplayBuffer
+from .monitor import ConvergenceMonitor
+from . import utils
+
+### ADDITIONAL UTILITY FUNCTION
+
+def some(pred, seq):
+    '''Returns the first successful application of pred to elements in seq.'''
+    for x in seq:
+        px = pred(x)
+        if px:
+            return px
+    return False
+
+def print_stats(steps, orgs):
+    '''Print statistics for orgs, a list of (type, strength, age) tuples.'''
+    print('POPULATION AFTER', steps, 'STEPS')
+    for typ in list(World.thing_specs.keys()):
+        if issubclass(typ, Org):
+            strength_sum = 0.0
+            age_sum = 0.0
+            n = 0
+            max_s = 0
+            for t_type, strength, age in orgs:
+                if issubclass(t_type, typ):
+                    strength_sum += strength
+                    if strength > max_s:
+                        max_s = strength
+                    age_sum += age
+                    n += 1
+            if n != 0:
+                print(typ.__name__ + ':  N', n, ' mean strength', int(strength_sum / n),\
+                      ' max strength', max_s, 'mean age', int(age_sum / n))
+
+class ClodMap:
+    '''Bitmaps of the pixel positions where clods are in the way.
+
+    bump says where the center of a moving critter would collide with a clod,
+    spawn where a new thing can't be placed.  Both have Critter.bump_offset and
+    Thing.radius baked in.  New clods are stamped in with add(); the world
+    rebuilds the map only when clods go.'''
+
+    def __init__(self, world):
+        """Stamp the footprint of every clod in the world into both bitmaps."""
+        self.world = world
+        self.width = world.width + 1
+        self.height = world.height + 1
+        self.bump = bytearray(self.width * self.height)
+        self.spawn = bytearray(self.width * self.height)
+        # Offsets of the footprints, worked out from the first clod stamped
+        self.bump_offsets = None
+        self.spawn_offsets = None
+        for thing in world.things:
+            if isinstance(thing, Clod):
+                self.add(thing)
+
+    def add(self, clod):
+        '''Stamp the footprint of a new clod into both bitmaps.'''
+        if self.bump_offsets is None:
+            # All clods have the same shape, so their footprints only differ by position
+            world = self.world
+            self.bump_offsets = self.footprint(clod, lambda x, y: world.bump_region(x, y, clamp=False))
+            self.spawn_offsets = self.footprint(clod, world.spawn_region)
+        self.stamp(self.bump, [clod], self.bump_offsets)
+        self.stamp(self.spawn, [clod], self.spawn_offsets)
+
+    def footprint(self, clod, region):
+        '''Offsets from the clod's center at which region(x, y) overlaps the clod.'''
+        cx, cy = clod.coords
+        reach = 2 * Thing.radius - Critter.bump_offset + 2
+        return [(dx, dy) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1) \
+                if clod.graphic_id in self.world.find_overlapping(*region(cx + dx, cy + dy))]
+
+    def stamp(self, bitmap, clods, offsets):
+        '''Mark the footprint given by offsets around each clod in bitmap.'''
+        for clod in clods:
+            cx, cy = clod.coords
+            for dx, dy in offsets:
+                x, y = cx + dx, cy + dy
+                if 0 <= x < self.width and 0 <= y < self.height:
+                    bitmap[y * self.width + x] = 1
+
+    def lookup(self, bitmap, x, y):
+        '''Value of bitmap at x, y, or None if that isn't a pixel position in the world.'''
+        if 0 <= x < self.width and 0 <= y < self.height and x == int(x) and y == int(y):
+            return bitmap[int(y) * self.width + int(x)]
+        return None
+
+class World:
+    """The arena where everything happens, including both graphics and thing representation.
+
+    Subclasses supply the Canvas methods (create_oval, coords, find_overlapping, ...)
+    and call setup()."""
+
+    color = 'black'
+    """Color for the Canvas background."""
+
+    steps_per_run = 500
+    """Number of steps to run when the 'Run' button is pushed."""
+
+    thing_specs = {Clod: {'init': 4},
+                   Diskoid: {'init': 16},
+                   Pentoid: {"init": 5},
+                   Plasmoid: {'init': 95, 'min': 80, 'max': 120,
+                              # { Each tuple defines a cluster: ((center_x, center_y), radius)
+                              'clusters': [((100, 100), 40), ((300, 300), 80)]
+                              # }
+                              }}
+    """Dictionary specifying things to created and maintain. Clod must come first."""
+
+    cache_cell = 30
+    """Side of the square cells in which changes are stamped, to invalidate reused
+    observations."""
+
+    reuse_observations = True
+    """Whether a critter's sensor reuses its last observation while the critter hasn't
+    moved or turned and nothing has changed in the cells it senses (see cache_cell)."""
+
+    clod_bitmap = True
+    """Whether bump and spawn checks against clods use a precomputed ClodMap."""
+
+    synchronous = False
+    """Whether all critters sense and decide before any of them acts."""
+
+    recycle = True
+    """Whether things taken out of the world are pooled and reused for new things."""
+
+    plant_field = False
+    """Whether plants are biomass in a PlantField rather than Plasmoid things."""
+
+    acoustic_field = False
+    """Whether sounds go into a SoundField rather than a list of individual sounds."""
+
+    replay_capacity = 0
+    """Experiences remembered for each class of critter (0 for no experience replay)."""
+
+    replay_batch = 32
+    """Remembered experiences learned from again for each class of critter on a replay."""
+
+    replay_every = 4
+    """Steps between replays."""
+
+    monitor_convergence = False
+    """Whether to watch learning with a ConvergenceMonitor and stop runs when it levels off."""
+
+    def setup(self, width, height):
+        """Initialize dimensions and the bookkeeping for things, and create things."""
+        self.width = width
+        self.height = height
+        self.things = []
+        # The things that aren't passive, in the same order as in things
+        self.agents = []
+        self.graphic_objs = {}
+        self.steps = 0
+        # Version stamps for cells of the world, used to validate reused observations
+        self.version = 0
+        self.cell_versions = {}
+        # Built when first needed, added to when clods are placed, thrown away when one is removed
+        self.clod_map = None
+        # Type -> retired things of that type, waiting to be reused
+        self.pools = {}
+        # The PlantField, if plant_field is set
+        self.plants = None
+        # Critter class -> ValueFunction shared by critters of that class
+        self.value_functions = {}
+        # Critter class -> ReplayBuffer of its critters' experiences
+        self.replay = {}
+        #this will save all sounds made in the world for a certain amount of steps
+        self.sounds = []
+        self.sound_field = SoundField(self) if self.acoustic_field else None
+        # (Critter class, event) -> count, for events like 'eat' and 'bump'
+        self.events = Counter()
+        # Objects whose after_step(world) is called after every step
+        self.observers = [ConvergenceMonitor()] if self.monitor_convergence else []
+        # Set by an observer to end the current run early
+        self.stop_run = False
+        # Phase -> total seconds spent in it by step(), if an observer sets it to a dict
+        self.phase_times = None
+        self.lap_start = 0.0
+        self.init_things()
+
+    def init_things(self):
+        """Use thing_specs to initialize the things in the world."""
+        for typ, specs in World.thing_specs.items():
+            if typ is Plasmoid and self.plant_field:
+                if self.plants:
+                    self.plants.destroy()
+                self.plants = PlantField(self, specs)
+            elif 'init' in specs:
+                # An initial number of things of this type is specified
+                for thing in range(specs['init']):
+                    #{ Change this line to have the 'clusters' argument
+                    self.add_thing(typ, clusters=specs.get('clusters', []))
+                    #}
+#                    self.add_thing(typ)
+
+    #{ Replace old add_thing with this
+
+
+    def add_sound(self, sound_coord, age=0):
+        if self.sound_field:
+            self.sound_field.add(sound_coord)
+        else:
+            self.sounds.append([sound_coord, age])
+            self.mark_changed(sound_coord)
+
+    
+    
+    def add_thing(self, tp, clusters=[]):
+        '''Create a thing of a given type and index.'''
+        coords = self.get_thing_coords(clusters=clusters)
+        return self.place_thing(tp, coords)
+
+    def place_thing(self, tp, coords):
+        '''Create (or recycle) a thing of a given type at coords and add it to the world.'''
+        pool = self.pools.get(tp)
+        if pool:
+            thing = pool.pop()
+            thing.reset(coords)
+        else:
+            thing = tp(self, coords)
+        self.graphic_objs[thing.graphic_id] = thing
+        self.things.append(thing)
+        if not thing.passive:
+            self.agents.append(thing)
+        self.mark_changed(coords)
+        if isinstance(thing, Clod) and self.clod_map:
+            self.clod_map.add(thing)
+        return thing
+    #}
+
+##    def add_thing(self, tp, coords=None):
+##        '''Create a thing of a given type at a random location.'''
+##        coords = coords or self.get_thing_coords(Clod)
+##        thing = tp(self, coords)
+##        self.things.append(thing)
+##        self.graphic_objs[thing.graphic_id] = thing
+##        return thing
+
+    #{ Replace old get_thing_coords with this
+    def get_thing_coords(self, clusters=[]):
+        '''Coordinates for a new thing, using clusters if there are any.'''
+        # Try again until the place isn't blocked (a loop, since with many clods it can take a while)
+        while True:
+            if clusters:
+                cluster = random.choice(clusters)
+                x, y = self.get_cluster_pos(cluster[1], cluster[0])
+            else:
+                x, y = (random.randint(Thing.radius,
+                                       self.width - Thing.radius),
+                        random.randint(Thing.radius,
+                                       self.height - Thing.radius))
+            if not self.blocked_by_clod(x, y):
+                return x, y
+    #}
+
+    #{ Add this cluster method
+    def get_cluster_pos(self, maxrad, center):
+        """Return a position given a cluster center and radius."""
+        c_x, c_y = center[0], center[1]
+        x = random.randint(0, maxrad)
+        y = random.randint(0, int(math.sqrt(maxrad * maxrad - x * x)))
+        if random.random() < .5:
+            x = -x
+        if random.random() < .5:
+            y = -y
+        return c_x + x, c_y + y
+    #}
+
+    def overlaps_with(self, x1, y1, x2, y2, kind, exclude=-1):
+        '''Does the region with coordinates x1, y1, x2, y2 overlap with any of type kind?'''
+        return some(lambda x: isinstance(x, kind),
+                    self.get_overlapping((x1, y1, x2, y2), exclude))
+
+##    def get_thing_coords(self, overlap_constraint):
+##        '''Coordinates for a new thing; can't overlap with a world edge or a Clod.'''
+##        x, y = (random.randint(Thing.radius, self.width - Thing.radius),
+##                random.randint(Thing.radius, self.height - Thing.radius))
+##        if overlap_constraint:
+##            overlapping = self.get_overlapping((x + Thing.radius, y + Thing.radius,
+##                                                x - Thing.radius, y - Thing.radius), None)
+##            if [o for o in overlapping if isinstance(o, overlap_constraint)]:
+##                # Try again
+##                return self.get_thing_coords(overlap_constraint)
+##        return x, y
+
+    ### Clods in the way
+
+    def bump_region(self, x, y, clamp=True):
+        '''Region checked for clods when a critter moves to x, y.'''
+        x1, y1 = x - Thing.radius + Critter.bump_offset, y - Thing.radius + Critter.bump_offset
+        x2, y2 = x + Thing.radius - Critter.bump_offset, y + Thing.radius - Critter.bump_offset
+        if clamp:
+            return max(0, x1), max(0, y1), min(self.width, x2), min(self.height, y2)
+        return x1, y1, x2, y2
+
+    def spawn_region(self, x, y):
+        '''Region that has to be free of clods for a new thing at x, y.'''
+        return x - Thing.radius, y - Thing.radius, x + Thing.radius, y + Thing.radius
+
+    def get_clod_map(self):
+        '''The ClodMap for the current clods, (re)building it if necessary.'''
+        if not self.clod_map:
+            self.clod_map = ClodMap(self)
+        return self.clod_map
+
+    def bumps_into_clod(self, x, y):
+        '''Would a critter moving to x, y collide with a clod?'''
+        if self.clod_bitmap:
+            hit = self.get_clod_map().lookup(self.clod_map.bump, x, y)
+            if hit is not None:
+                return hit
+        return self.overlaps_with(*self.bump_region(x, y), kind=Clod)
+
+    def blocked_by_clod(self, x, y):
+        '''Would a new thing at x, y overlap with a clod?'''
+        if self.clod_bitmap:
+            hit = self.get_clod_map().lookup(self.clod_map.spawn, x, y)
+            if hit is not None:
+                return hit
+        return self.overlaps_with(*self.spawn_region(x, y), kind=Clod)
+
+    def adjust_coords(self, coords):
+        '''Adjust coordinates of moved critter, assuming the world wraps around.'''
+        x, y = coords
+        if x < 0:
+            x = self.width + x
+        elif x > self.width:
+            x = x - self.width
+        if y < 0:
+            y = self.height + y
+        elif y > self.height:
+            y = y - self.height
+        return x, y
+
+    def get_overlapping(self, coords, except_thing_id):
+        '''Things that overlap with coordinates coords other than except_thing.'''
+        region = tuple(int(round(c)) for c in coords)
+        return [self.graphic_objs[thing_id] for thing_id in self.find_overlapping(*region) \
+                if thing_id in self.graphic_objs and thing_id != except_thing_id]
+
+    ### Change tracking for reused observations
+
+    def region_cells(self, region):
+        '''The cache cells covered by region, a tuple x1, y1, x2, y2.'''
+        x1, y1, x2, y2 = region
+        size = World.cache_cell
+        return [(cx, cy) for cx in range(int(x1 // size), int(x2 // size) + 1) \
+                for cy in range(int(y1 // size), int(y2 // size) + 1)]
+
+    def region_version(self, region):
+        '''The version at which something last changed in region.'''
+        return max([self.cell_versions.get(cell, 0) for cell in self.region_cells(region)])
+
+    def mark_changed(self, coords):
+        '''Record that a thing centered at coords has appeared, changed or disappeared.'''
+        x, y = coords
+        # One extra pixel for the outline of the Canvas object
+        margin = Thing.radius + 1
+        self.mark_region((x - margin, y - margin, x + margin, y + margin))
+
+    def mark_region(self, region):
+        '''Record that something has changed in region, a tuple x1, y1, x2, y2.'''
+        self.version += 1
+        for cell in self.region_cells(region):
+            self.cell_versions[cell] = self.version
+
+    def get_value_function(self, critter):
+        '''The ValueFunction shared by critters of the critter's class, made if necessary.'''
+        typ = type(critter)
+        if typ not in self.value_functions:
+            self.value_functions[typ] = value_functions[critter.value_function](critter.sensor,
+                                                                               len(critter.actions))
+        return self.value_functions[typ]
+
+    def remember(self, critter, state, action, reinforcement, next_state):
+        '''Keep an experience of critter's for replay, if replay is on.'''
+        if self.replay_capacity:
+            typ = type(critter)
+            if typ not in self.replay:
+                self.replay[typ] = ReplayBuffer(self.replay_capacity)
+            self.replay[typ].add(critter, state, action, reinforcement, next_state)
+
+    def get_n_things(self, typ):
+        '''Number of things in the world of a given type.'''
+        return len([thing for thing in self.things if isinstance(thing, typ)])
+
+    def step(self):
+        """Step each of the things and do other updating (creating and destroying)."""
+        timing = self.phase_times is not None
+        if timing:
+            self.lap_start = time.perf_counter()
+        self.replenish()
+        if self.plants:
+            self.plants.grow()
+        if timing:
+            self.lap('replenish')
+        # Now step each of things
+        if self.synchronous:
+            self.synchronous_step()
+        else:
+            # Passive things (clods, plasmoids) don't need stepping; see Org.age
+            for thing in self.agents:
+                thing.step()
+        if timing:
+            self.lap('agents')
+        # Kill off things that have died
+        self.kill_off()
+        if timing:
+            self.lap('kill_off')
+        # Increment steps
+        self.steps += 1
+        #this ages all the sounds in the world, and removes them if they get passed four steps
+        for sound in self.sounds:
+            sound[1] += 1
+            if sound[1] >= 4:
+                self.mark_changed(sound[0])
+        # Not removed in the loop above, which would skip the sound after each one removed
+        self.sounds = [sound for sound in self.sounds if sound[1] < 4]
+        if self.sound_field:
+            self.sound_field.step()
+        if timing:
+            self.lap('sounds')
+        # Learn again from some of the remembered experiences
+        if self.replay_capacity and self.steps % self.replay_every == 0:
+            for buffer in self.replay.values():
+                buffer.replay(self.replay_batch)
+        # Shared value functions learn from all of this step's experience at once
+        for value_function in self.value_functions.values():
+            value_function.flush(Critter.eta)
+        if timing:
+            self.lap('learn')
+        for observer in self.observers:
+            observer.after_step(self)
+        #print(self.sounds)
+
+    def lap(self, phase):
+        '''Add the time since the last lap to the total for phase in phase_times.'''
+        now = time.perf_counter()
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - self.lap_start
+        self.lap_start = now
+
+    def replenish(self):
+        """Recreate things if number has fallen below minimum for type."""
+        for typ, specs in World.thing_specs.items():
+            if 'min' in specs and not (typ is Plasmoid and self.plants):
+                n_things = self.get_n_things(typ)
+                for thing in range(specs['min'] - n_things):
+                    #{ Change this line to include the clusters argument
+                    self.add_thing(typ, clusters=specs.get('clusters', []))
+                    #}
+#                    self.add_thing(typ)
+
+    def synchronous_step(self):
+        """Step things in two phases: every critter senses and decides, then all act.
+
+        Nothing changes in the world during the first phase, so each critter sees
+        the world as it was at the start of the step.  Actions are then carried out
+        in the (creation) order of self.things, which settles conflicts such as two
+        critters trying to eat the same thing in a deterministic way.  A critter
+        eaten by one that acted before it doesn't act."""
+        critters = [thing for thing in self.agents if isinstance(thing, Critter)]
+        self.sense_phase(critters)
+        for thing in self.agents:
+            if not isinstance(thing, Critter):
+                thing.step()
+        for critter in critters:
+            if critter.alive:
+                critter.act()
+
+    def sense_phase(self, critters):
+        """Let each critter sense and choose an action, one after another.
+
+        There is no parallel version of this phase: deciding draws on the shared
+        random number stream, so runs would stop being reproducible, and handing the
+        world to other processes every step costs more than the sensing itself.  To
+        use several cores, split the world into tiles with a TiledWorld instead."""
+        for critter in critters:
+            critter.prepare()
+
+    def kill_off(self, everybody=False):
+        """Kill off orgs that have died or all things if everybody is True."""
+        for thing in self.things[:]:
+            if everybody or (isinstance(thing, Org) and not thing.alive):
+                self.remove_thing(thing)
+
+    def remove_thing(self, thing):
+        """Take a thing out of the world, keeping it for reuse if recycling."""
+        if self.recycle:
+            thing.retire()
+            self.pools.setdefault(type(thing), []).append(thing)
+        else:
+            thing.kill()
+        self.things.remove(thing)
+        if not thing.passive:
+            self.agents.remove(thing)
+        if isinstance(thing, Clod):
+            self.clod_map = None
+ 
+    def run(self):
+        """Run step() steps_per_run times on everything, and display the world."""
+        self.stop_run = False
+        for s in range(World.steps_per_run):
+            self.step()
+            self.update_idletasks()
+            if self.stop_run:
+                break
+        self.run_stats()
+        print(self.sounds)
+
+    def run_stats(self, verbose=False):
+        '''Print useful statistics about the types in the population of orgs.'''
+        print_stats(self.steps, [(type(t), t.strength, t.age) for t in self.things \
+                                 if isinstance(t, Org)])
+        if self.plants:
+            print('Plants:  cells', len(self.plants.fertile),
+                  ' total biomass', int(self.plants.total()))
+        for observer in self.observers:
+            if hasattr(observer, 'report'):
+                observer.report()
+
+    def memory_report(self):
+        '''Print the bytes taken up by each type of thing, to help size big runs.
+
+        Each thing is charged for what only it refers to: its coordinates, and
+        for critters their sensor, policy and Q table (but not a shared value
+        function).  Canvas items aren't included.'''
+        seen = set()
+        sizes = {}
+        for thing in self.things:
+            size = sizes.setdefault(type(thing), [0, 0])
+            size[0] += 1
+            size[1] += thing.footprint(seen)
+        print('MEMORY AFTER', self.steps, 'STEPS')
+        for typ, (n, total) in sizes.items():
+            print(typ.__name__ + ':  N', n, ' bytes per thing', total // n, ' total', total)
+
+    def reinit(self):
+        """Get rid of everything and recreate initial numbers of things."""
+        self.kill_off(True)
+        # Reset steps first, since the new things are born at this step
+        self.steps = 0
+        self.value_functions = {}
+        self.replay = {}
+        self.init_things()
+        print('=================================== REINITIALIZING ===================================')
+
+class HeadlessWorld(Arena, World):
+    '''A World without a display, kept entirely in memory.'''
+
+    def __init__(self, width=450, height=450):
+        """Set up the world and create its initial things."""
+        Arena.__init__(self)
+        self.frame = None
+        self.setup(width, height)
+
+def make_world(width=450, height=450, seed=None, gui=False):
+    '''Make a world, seeding the random numbers first if seed is given.
+
+    With gui, the world is a Canvas in a WorldFrame in a new Tk window (call
+    world.mainloop() to show it); otherwise it is a HeadlessWorld, and tkinter
+    isn't even imported.'''
+    if seed is not None:
+        random.seed(seed)
+    if gui:
+        from .gui import make_gui_world
+        return make_gui_world(width, height)
+    return HeadlessWorld(width, height)